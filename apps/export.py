@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Literal, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def _ndjson_chunks(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    async for rows in partitions:
+        yield "".join(json.dumps(row._asdict(), default=_json_default) + "\n" for row in rows)
+
+
+async def _csv_chunks(partitions: AsyncIterator[Sequence[Row]], columns: Sequence[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+        partitions: AsyncIterator[Sequence[Row]], columns: Sequence[str], file_format: ExportFormat, filename: str,
+) -> StreamingResponse:
+    """Serialize rows one partition at a time, memory stays bounded by the partition size."""
+    chunks = _csv_chunks(partitions, columns) if file_format == "csv" else _ndjson_chunks(partitions)
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{file_format}"'},
+    )
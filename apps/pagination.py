@@ -0,0 +1,6 @@
+from fastapi import Query
+from fastapi_pagination.cursor import CursorParams
+
+
+class KeysetParams(CursorParams):
+    size: int = Query(50, ge=1, le=100, description="Page size")
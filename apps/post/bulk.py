@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+
+from config import BULK_IMPORT_BATCH_SIZE, REDIS_HOST, REDIS_PORT
+from db.session import async_session
+
+from .cache import post_cache, post_slug_cache
+from .repository.sqlalchemy import SQLAlchemyPostRepository
+from .service import ImportRecord, PostService
+
+FORMATS = ("ndjson", "csv")
+CHUNK_SIZE = 1024 * 1024
+
+
+async def _iter_line_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[str]]:
+    """The complete lines of each chunk, without their line breaks."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        if lines:
+            yield lines
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield [tail]
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    async for lines in _iter_line_batches(chunks):
+        for line in lines:
+            yield line
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    row = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, record, None
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    """Rows of a CSV stream with a header line, quoted fields may span lines.
+
+    The csv module reads the lines of every chunk and tracks the quoting. A
+    record that reaches the last line read so far may go on in the next
+    chunk, so its lines are kept and parsed again together with that chunk.
+    """
+    header = None
+    row = 0
+    pending: list[str] = []
+    batches = _iter_line_batches(chunks)
+    while True:
+        lines = await anext(batches, None)
+        final = lines is None
+        pending.extend(f"{line}\n" for line in lines or ())
+        reader = csv.reader(pending, strict=True)
+        consumed = 0
+        while True:
+            try:
+                values, error = next(reader), None
+            except StopIteration:
+                break
+            except csv.Error as exc:
+                values, error = None, f"Invalid CSV: {exc}"
+            if not final and reader.line_num == len(pending):
+                break
+            consumed = reader.line_num
+            if values is not None and (not values or len(values) == 1 and not values[0].strip()):
+                continue
+            if header is None:
+                if error is None:
+                    header = values
+                    continue
+            row += 1
+            if error is None and len(values) != len(header):
+                error = f"Expected {len(header)} fields, got {len(values)}"
+            yield (row, None, error) if error else (row, dict(zip(header, values)), None)
+        if final:
+            return
+        pending = pending[consumed:]
+
+
+def iter_records(chunks: AsyncIterator[bytes], file_format: str) -> AsyncIterator[ImportRecord]:
+    return iter_csv(chunks) if file_format == "csv" else iter_ndjson(chunks)
+
+
+async def _read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            yield chunk
+
+
+async def _main(path: str, file_format: str, author_id: int, batch_size: int) -> None:
+    redis = aioredis.from_url(f"redis://{REDIS_HOST}:{REDIS_PORT}", encoding="utf8", decode_responses=True)
+    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    async with async_session() as session:
+        post_service = PostService(
+            post_repository=SQLAlchemyPostRepository(db_session=session),
+            post_cache=post_cache, post_slug_cache=post_slug_cache,
+        )
+        import_result = await post_service.bulk_import(
+            iter_records(_read_file(path), file_format), default_author_id=author_id, batch_size=batch_size,
+        )
+    print(import_result.data.model_dump_json(indent=2))
+
+
+def _format_of(path: str) -> str:
+    return "csv" if path.endswith(".csv") else "ndjson"
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk import posts from an NDJSON or CSV file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--author-id", type=int, required=True, help="author of rows without an author_id")
+    parser.add_argument("--batch-size", type=int, default=BULK_IMPORT_BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    asyncio.run(_main(args.path, args.format or _format_of(args.path), args.author_id, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from caching.tiered import TieredCache
+from config import (POST_CACHE_LOCAL_TTL_SECONDS, POST_CACHE_MAX_BYTES,
+                    POST_CACHE_MAX_ENTRIES, POST_CACHE_TTL_SECONDS)
+
+from .schemas import PostRef, ShowPost
+
+post_cache = TieredCache(
+    name="post",
+    model=ShowPost,
+    ttl=POST_CACHE_TTL_SECONDS,
+    local_ttl=POST_CACHE_LOCAL_TTL_SECONDS,
+    max_entries=POST_CACHE_MAX_ENTRIES,
+    max_bytes=POST_CACHE_MAX_BYTES,
+)
+
+# slug -> id, checked against the cached post on read instead of being invalidated on slug changes.
+post_slug_cache = TieredCache(
+    name="post-slug",
+    model=PostRef,
+    ttl=POST_CACHE_TTL_SECONDS,
+    local_ttl=POST_CACHE_LOCAL_TTL_SECONDS,
+    max_entries=POST_CACHE_MAX_ENTRIES,
+    max_bytes=POST_CACHE_MAX_ENTRIES * 64,
+)
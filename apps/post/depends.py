@@ -1,12 +1,17 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.session import get_db
+from db.session import get_db, get_read_db
 
+from .cache import post_cache, post_slug_cache
 from .repository.sqlalchemy import SQLAlchemyPostRepository
 from .service import PostService
 
 
-async def get_post_service_sqlalchemy(db_session: AsyncSession = Depends(get_db)) -> PostService:
-    sqlalchemy_post_repository = SQLAlchemyPostRepository(db_session=db_session)
-    return PostService(post_repository=sqlalchemy_post_repository)
+async def get_post_service_sqlalchemy(
+        db_session: AsyncSession = Depends(get_db), read_session: AsyncSession = Depends(get_read_db),
+) -> PostService:
+    sqlalchemy_post_repository = SQLAlchemyPostRepository(db_session=db_session, read_session=read_session)
+    return PostService(
+        post_repository=sqlalchemy_post_repository, post_cache=post_cache, post_slug_cache=post_slug_cache,
+    )
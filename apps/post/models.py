@@ -1,7 +1,8 @@
 from datetime import datetime
 
-from sqlalchemy import TIMESTAMP, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import TIMESTAMP, Computed, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql.schema import Column, ForeignKey
 
 from db.session import Base
@@ -12,12 +13,25 @@ class Post(Base):
 
     id: int = Column(Integer, primary_key=True)
     author_id: int = Column(ForeignKey('users.id'), nullable=False)
-    slug: str = Column(String, index=True)
+    slug: str = Column(String)
     title: str = Column(String(100), index=True, nullable=False)
     text: str = Column(String, nullable=False)
     short_description: str = Column(String(240), nullable=False)
     published_at: datetime = Column(
-        TIMESTAMP(timezone=True), default=datetime.now()
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
     )
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(short_description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(text, '')), 'C')",
+        persisted=True,
+    )))
 
     author = relationship("User", back_populates="posts")
+
+    __table_args__ = (
+        Index("ix_posts_slug", "slug", unique=True, postgresql_ops={"slug": "varchar_pattern_ops"}),
+        Index("ix_posts_published_at_id", "published_at", "id"),
+        Index("ix_posts_author_id_published_at_id", author_id, published_at.desc(), id.desc()),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
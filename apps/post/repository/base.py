@@ -1,9 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Sequence
+from typing import Any, AsyncIterator, Iterable, Sequence
 
 from apps.post.models import Post
-from apps.post.schemas import PostCreate
+from apps.post.schemas import PostCreate, PostImportRow
 from apps.user.models import User
+from db.pagination import KeysetPage
+
+
+class PostBatchRejectedError(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Batch rejected by the database: {reason}")
+        self.reason = reason
 
 
 class PostRepository(ABC):
@@ -11,22 +18,46 @@ class PostRepository(ABC):
     async def create(self, post: PostCreate, current_user: User) -> Post:
         ...
 
+    @abstractmethod
+    async def bulk_create(self, posts: Sequence[PostImportRow]) -> int:
+        ...
+
+    @abstractmethod
+    async def existing_author_ids(self, author_ids: Iterable[int]) -> set[int]:
+        ...
+
     @abstractmethod
     async def get_post(self, post_id: int) -> Post | None:
         ...
 
     @abstractmethod
-    async def get_by_user_id(self, user_id: int) -> Sequence[Post]:
+    async def get_by_slug(self, slug: str) -> Post | None:
+        ...
+
+    @abstractmethod
+    async def get_page(self, size: int, cursor: str | None = None) -> KeysetPage:
+        ...
+
+    @abstractmethod
+    async def get_page_by_user_id(self, user_id: int, size: int, cursor: str | None = None) -> KeysetPage:
+        ...
+
+    @abstractmethod
+    async def search(self, query_text: str, size: int, cursor: str | None = None) -> KeysetPage:
+        ...
+
+    @abstractmethod
+    def export(self, batch_size: int) -> AsyncIterator[Sequence[Any]]:
         ...
 
     @abstractmethod
-    async def get_all(self) -> Sequence[Post]:
+    async def exists(self, post_id: int) -> bool:
         ...
 
     @abstractmethod
-    async def update(self, post_id: int, updated_post_params: dict) -> Post | None:
+    async def update_if_permitted(self, post_id: int, current_user: User, updated_post_params: dict) -> Post | None:
         ...
 
     @abstractmethod
-    async def delete(self, post_id: int) -> None:
+    async def delete_if_permitted(self, post_id: int, current_user: User) -> bool:
         ...
@@ -1,54 +1,226 @@
-from datetime import datetime
-from typing import Sequence
+from datetime import datetime, timezone
+from secrets import token_hex
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence
 
+from asyncpg import PostgresError, UniqueViolationError
 from slugify import slugify
-from sqlalchemy import delete, select, update
+from sqlalchemy import (Executable, Float, Integer, String, case, cast, delete,
+                        exists, func, insert, literal, or_, select, text, true,
+                        update)
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.elements import ColumnElement
 
 from apps.post.models import Post
-from apps.post.schemas import PostCreate
+from apps.post.schemas import PostCreate, PostImportRow
+from apps.user import security
 from apps.user.models import User
+from db.pagination import KeysetPage, paginate_keyset
+from db.streaming import stream_snapshot
 
-from .base import PostRepository
+from .base import PostBatchRejectedError, PostRepository
+
+POST_SUMMARY_COLUMNS = (Post.id, Post.author_id, Post.title, Post.short_description, Post.slug, Post.published_at)
+
+SLUG_INDEX = "ix_posts_slug"
+
+EXPORT_COLUMNS = (
+    Post.id, Post.author_id, Post.slug, Post.title, Post.text, Post.short_description, Post.published_at,
+)
+
+BULK_COLUMNS = ("author_id", "slug", "title", "text", "short_description", "published_at")
+
+# Per base slug: whether it is taken and the highest numeric suffix in use, read off the slug index.
+# The range holds the slugs starting with `base-`, only what follows is matched, so `base` is never a pattern.
+SLUG_USAGE = text(
+    """
+    SELECT base,
+           EXISTS (SELECT 1 FROM posts WHERE slug = base) AS taken,
+           (SELECT max(substring(slug FROM length(base) + 2)::int) FROM posts
+            WHERE slug ~>=~ (base || '-') AND slug ~<~ (base || '.')
+              AND substring(slug FROM length(base) + 2) ~ '^[0-9]+$'
+           ) AS max_suffix
+    FROM unnest(CAST(:bases AS text[])) AS base
+    """
+)
 
 
 class SQLAlchemyPostRepository(PostRepository):
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, read_session: AsyncSession | None = None):
         self._db_session = db_session
+        self._read_session = read_session or db_session
 
     async def create(self, post: PostCreate, current_user: User) -> Post:
-        new_post = Post(
-            title=post.title,
-            short_description=post.short_description,
-            text=post.text,
-            slug=slugify(post.title),
-            author_id=current_user.id,
-            published_at=datetime.now()
-        )
-        self._db_session.add(new_post)
+        def build_query(slug: Any) -> Executable:
+            return insert(Post).values(
+                title=post.title,
+                short_description=post.short_description,
+                text=post.text,
+                slug=slug,
+                author_id=current_user.id,
+                published_at=datetime.now(),
+            ).returning(Post)
+
+        result = await self._execute_with_slug(build_query, title=post.title)
+        new_post = result.scalars().one()
         await self._db_session.commit()
         return new_post
 
+    async def bulk_create(self, posts: Sequence[PostImportRow]) -> int:
+        bases = [_base_slug(post.title) for post in posts]
+        try:
+            try:
+                await self._copy_posts(posts, slugs=await self._assign_slugs(bases))
+            except UniqueViolationError as exc:
+                if exc.constraint_name != SLUG_INDEX:
+                    raise
+                await self._db_session.rollback()
+                await self._copy_posts(posts, slugs=[f"{base}-{token_hex(4)}" for base in bases])
+            await self._db_session.commit()
+        except (PostgresError, DBAPIError) as exc:
+            await self._db_session.rollback()
+            raise PostBatchRejectedError(str(getattr(exc, "orig", None) or exc)) from exc
+        return len(posts)
+
+    async def existing_author_ids(self, author_ids: Iterable[int]) -> set[int]:
+        query = select(User.id).where(User.id.in_(set(author_ids)))
+        result = await self._db_session.execute(query)
+        return set(result.scalars().all())
+
     async def get_post(self, post_id: int) -> Post | None:
         query = select(Post).filter_by(id=post_id)
-        result = await self._db_session.execute(query)
+        result = await self._read_session.execute(query)
         return result.scalars().first()
 
-    async def get_by_user_id(self, user_id: int) -> Sequence[Post]:
-        query = select(Post).filter_by(author_id=user_id)
-        result = await self._db_session.execute(query)
-        return result.scalars().all()
+    async def get_by_slug(self, slug: str) -> Post | None:
+        query = select(Post).filter_by(slug=slug)
+        result = await self._read_session.execute(query)
+        return result.scalars().first()
 
-    async def get_all(self) -> Sequence[Post]:
-        query = select(Post)
-        result = await self._db_session.execute(query)
-        return result.scalars().all()
+    async def get_page(self, size: int, cursor: str | None = None) -> KeysetPage:
+        query = select(*POST_SUMMARY_COLUMNS)
+        return await paginate_keyset(
+            self._read_session, query, keys=(Post.published_at, Post.id), size=size, cursor=cursor, scalars=False,
+        )
+
+    async def get_page_by_user_id(self, user_id: int, size: int, cursor: str | None = None) -> KeysetPage:
+        query = select(*POST_SUMMARY_COLUMNS).filter_by(author_id=user_id)
+        return await paginate_keyset(
+            self._read_session, query, keys=(Post.published_at, Post.id), size=size, cursor=cursor, scalars=False,
+        )
 
-    async def update(self, post_id: int, updated_post_params: dict) -> Post | None:
-        query = update(Post).filter_by(id=post_id).values(**updated_post_params).returning(Post)
+    async def search(self, query_text: str, size: int, cursor: str | None = None) -> KeysetPage:
+        ts_query = func.websearch_to_tsquery("english", query_text)
+        rank = func.ts_rank(Post.search_vector, ts_query, type_=Float).label("rank")
+        query = select(*POST_SUMMARY_COLUMNS, rank).where(Post.search_vector.bool_op("@@")(ts_query))
+        return await paginate_keyset(
+            self._read_session, query, keys=(rank, Post.id), size=size, cursor=cursor, scalars=False,
+        )
+
+    async def export(self, batch_size: int) -> AsyncIterator[Sequence[Any]]:
+        query = select(*EXPORT_COLUMNS).order_by(Post.id)
+        async for rows in stream_snapshot(self._read_session, query, batch_size=batch_size):
+            yield rows
+
+    async def exists(self, post_id: int) -> bool:
+        query = select(Post).filter_by(id=post_id).exists()
+        result = await self._db_session.execute(query.select())
+        return result.scalar()
+
+    async def update_if_permitted(self, post_id: int, current_user: User, updated_post_params: dict) -> Post | None:
+        def build_query(slug: Any) -> Executable:
+            values = updated_post_params if slug is None else {**updated_post_params, "slug": slug}
+            return (
+                update(Post)
+                .where(Post.id == post_id, _mutable_by(current_user))
+                .values(**values)
+                .returning(Post)
+            )
+
+        title = updated_post_params.get("title")
+        if title is None:
+            result = await self._db_session.execute(build_query(None))
+        else:
+            result = await self._execute_with_slug(build_query, title=title, post_id=post_id)
+        updated_post = result.scalars().first()
+        await self._db_session.commit()
+        return updated_post
+
+    async def delete_if_permitted(self, post_id: int, current_user: User) -> bool:
+        query = delete(Post).where(Post.id == post_id, _mutable_by(current_user)).returning(Post.id)
         result = await self._db_session.execute(query)
-        return result.scalars().first()
+        deleted = result.scalar() is not None
+        await self._db_session.commit()
+        return deleted
+
+    async def _assign_slugs(self, bases: Sequence[str]) -> list[str]:
+        result = await self._db_session.execute(SLUG_USAGE, {"bases": sorted(set(bases))})
+        rows = result.all()
+        base_free = {row.base: not row.taken for row in rows}
+        next_suffix = {row.base: (row.max_suffix or 1) + 1 for row in rows}
+        # A base can look like another one with a suffix ("x-2" and "x"), so every slug handed out is reserved.
+        assigned: set[str] = set()
+        slugs = []
+        for base in bases:
+            slug = base
+            if not base_free[base] or slug in assigned:
+                while (slug := f"{base}-{next_suffix[base]}") in assigned:
+                    next_suffix[base] += 1
+                next_suffix[base] += 1
+            assigned.add(slug)
+            slugs.append(slug)
+        return slugs
+
+    async def _copy_posts(self, posts: Sequence[PostImportRow], slugs: Sequence[str]) -> None:
+        now = datetime.now(timezone.utc)
+        records = [
+            (post.author_id, slug, post.title, post.text, post.short_description, post.published_at or now)
+            for post, slug in zip(posts, slugs)
+        ]
+        connection = await self._db_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table("posts", records=records, columns=BULK_COLUMNS)
+
+    async def _execute_with_slug(
+            self, build_query: Callable[[Any], Executable], title: str, post_id: int | None = None,
+    ) -> Any:
+        # The slug is picked inside the statement; only a concurrent writer taking
+        # the same one can still collide, then a random suffix settles it.
+        try:
+            return await self._db_session.execute(build_query(_unique_slug(title, post_id=post_id)))
+        except IntegrityError as exc:
+            await self._db_session.rollback()
+            if getattr(exc.orig.__cause__, "constraint_name", None) != SLUG_INDEX:
+                raise
+        return await self._db_session.execute(build_query(f"{_base_slug(title)}-{token_hex(4)}"))
+
+
+def _base_slug(title: str) -> str:
+    return slugify(title) or "post"
+
+
+def _unique_slug(title: str, post_id: int | None = None) -> ColumnElement[str]:
+    """`slugify(title)` if free, otherwise it with the next free numeric suffix."""
+    base = _base_slug(title)
+    other = aliased(Post, name="other_post")
+    not_self = other.id != post_id if post_id is not None else true()
+    taken = select(other.id).where(other.slug == base, not_self).exists()
+    # Same index range and suffix match as SLUG_USAGE.
+    suffix = func.substring(other.slug, len(base) + 2)
+    next_suffix = (
+        select(func.coalesce(func.max(cast(suffix, Integer)), 1) + 1)
+        .where(
+            other.slug.op("~>=~")(f"{base}-"), other.slug.op("~<~")(f"{base}."), suffix.regexp_match("^[0-9]+$"),
+            not_self,
+        )
+        .scalar_subquery()
+    )
+    return case((~taken, literal(base)), else_=literal(f"{base}-") + cast(next_suffix, String))
+
 
-    async def delete(self, post_id: int) -> None:
-        query = delete(Post).filter_by(id=post_id)
-        await self._db_session.execute(query)
+def _mutable_by(current_user: User) -> ColumnElement[bool]:
+    return or_(
+        Post.author_id == current_user.id,
+        exists().where(User.id == Post.author_id, security.permission_clause(current_user=current_user)),
+    )
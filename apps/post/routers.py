@@ -1,23 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from fastapi_cache.decorator import cache
-from fastapi_pagination import Page, paginate
+from typing import Literal
+
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, status)
+from fastapi.responses import StreamingResponse
+from fastapi_pagination.cursor import CursorPage
+from pydantic import TypeAdapter
 
 import apps.user.depends
-from apps.post.schemas import (PostCreate, PostServiceResult, ShowPost,
-                               UpdatedPostResponse, UpdatePostRequest)
+from apps.export import ExportFormat, export_response
+from apps.pagination import KeysetParams
+from apps.post.schemas import (PostCreate, PostImportReport, PostSummary,
+                               ShowPost, UpdatedPostResponse,
+                               UpdatePostRequest)
+from apps.responses import respond
+from apps.results import ServiceResult
 from apps.user.models import User
+from caching.namespaces import POSTS_NAMESPACE, cache_list
 
+from .bulk import iter_records
 from .depends import get_post_service_sqlalchemy
+from .repository.sqlalchemy import EXPORT_COLUMNS
 from .service import PostService
 
 post_router = APIRouter(
     prefix='/posts',
 )
 
+SHOW_POST_ADAPTER = TypeAdapter(ShowPost)
+POST_SUMMARY_PAGE_ADAPTER = TypeAdapter(CursorPage[PostSummary])
+
 
 @post_router.get("/", response_model=ShowPost, tags=['Posts'])
 async def get_post(post_id: int, post_service: PostService = Depends(get_post_service_sqlalchemy)) -> ShowPost:
-    post_result: PostServiceResult = await post_service.get_post(post_id=post_id)
+    post_result: ServiceResult = await post_service.get_post(post_id=post_id)
+
+    if not post_result.success:
+        raise HTTPException(
+            status_code=post_result.status_code,
+            detail=post_result.detail,
+        )
+
+    return respond(SHOW_POST_ADAPTER, post_result.data)
+
+
+@post_router.get("/by-slug/{slug}", response_model=ShowPost, tags=['Posts'])
+async def get_by_slug(slug: str, post_service: PostService = Depends(get_post_service_sqlalchemy)) -> ShowPost:
+    post_result: ServiceResult = await post_service.get_by_slug(slug=slug)
 
     if not post_result.success:
         raise HTTPException(
@@ -25,22 +53,84 @@ async def get_post(post_id: int, post_service: PostService = Depends(get_post_se
             detail=post_result.detail,
         )
 
-    return post_result.data
+    return respond(SHOW_POST_ADAPTER, post_result.data)
+
+
+@post_router.get("/export", tags=['Posts'])
+async def export(
+        file_format: ExportFormat = Query("ndjson", alias="format"),
+        post_service: PostService = Depends(get_post_service_sqlalchemy),
+        current_user: User = Depends(apps.user.depends.get_current_admin),
+) -> StreamingResponse:
+    export_result: ServiceResult = await post_service.export()
+    return export_response(
+        export_result.data, columns=[column.key for column in EXPORT_COLUMNS], file_format=file_format,
+        filename="posts",
+    )
 
 
-@post_router.get("/user_id", response_model=Page[ShowPost], tags=['Posts'])
+@post_router.get("/user_id", response_model=CursorPage[PostSummary], tags=['Posts'])
+@cache_list(POSTS_NAMESPACE)
 async def get_posts_by_user_id(
-        user_id: int, post_service: PostService = Depends(get_post_service_sqlalchemy),
-) -> Page[ShowPost]:
-    user_posts: PostServiceResult = await post_service.get_by_user_id(user_id=user_id)
-    return paginate(user_posts.data)
+        user_id: int, params: KeysetParams = Depends(),
+        post_service: PostService = Depends(get_post_service_sqlalchemy),
+) -> CursorPage[PostSummary]:
+    page_result: ServiceResult = await post_service.get_page_by_user_id(
+        user_id=user_id, size=params.size, cursor=params.cursor,
+    )
 
+    if not page_result.success:
+        raise HTTPException(
+            status_code=page_result.status_code,
+            detail=page_result.detail,
+        )
 
-@post_router.get("/list", response_model=Page[ShowPost], tags=['Posts'])
-@cache(expire=60)
-async def get_all(post_service: PostService = Depends(get_post_service_sqlalchemy)) -> Page[ShowPost]:
-    result_posts: PostServiceResult = await post_service.get_all()
-    return paginate(result_posts.data)
+    page = page_result.data
+    return respond(
+        POST_SUMMARY_PAGE_ADAPTER,
+        CursorPage[PostSummary](items=page.items, next_page=page.next_cursor, previous_page=page.previous_cursor),
+    )
+
+
+@post_router.get("/list", response_model=CursorPage[PostSummary], tags=['Posts'])
+@cache_list(POSTS_NAMESPACE)
+async def get_all(
+        params: KeysetParams = Depends(), post_service: PostService = Depends(get_post_service_sqlalchemy),
+) -> CursorPage[PostSummary]:
+    page_result: ServiceResult = await post_service.get_page(size=params.size, cursor=params.cursor)
+
+    if not page_result.success:
+        raise HTTPException(
+            status_code=page_result.status_code,
+            detail=page_result.detail,
+        )
+
+    page = page_result.data
+    return respond(
+        POST_SUMMARY_PAGE_ADAPTER,
+        CursorPage[PostSummary](items=page.items, next_page=page.next_cursor, previous_page=page.previous_cursor),
+    )
+
+
+@post_router.get("/search", response_model=CursorPage[PostSummary], tags=['Posts'])
+@cache_list(POSTS_NAMESPACE)
+async def search(
+        q: str = Query(min_length=1, max_length=200), params: KeysetParams = Depends(),
+        post_service: PostService = Depends(get_post_service_sqlalchemy),
+) -> CursorPage[PostSummary]:
+    page_result: ServiceResult = await post_service.search(query_text=q, size=params.size, cursor=params.cursor)
+
+    if not page_result.success:
+        raise HTTPException(
+            status_code=page_result.status_code,
+            detail=page_result.detail,
+        )
+
+    page = page_result.data
+    return respond(
+        POST_SUMMARY_PAGE_ADAPTER,
+        CursorPage[PostSummary](items=page.items, next_page=page.next_cursor, previous_page=page.previous_cursor),
+    )
 
 
 @post_router.post("/", response_model=ShowPost, tags=['Posts'])
@@ -49,10 +139,23 @@ async def create(
         post_service: PostService = Depends(get_post_service_sqlalchemy),
         current_user: User = Depends(apps.user.depends.get_current_user_from_token),
 ) -> ShowPost:
-    create_result: PostServiceResult = await post_service.create(post=post, current_user=current_user)
+    create_result: ServiceResult = await post_service.create(post=post, current_user=current_user)
     return create_result.data
 
 
+@post_router.post("/import", response_model=PostImportReport, tags=['Posts'])
+async def bulk_import(
+        request: Request,
+        file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+        post_service: PostService = Depends(get_post_service_sqlalchemy),
+        current_user: User = Depends(apps.user.depends.get_current_admin),
+) -> PostImportReport:
+    import_result: ServiceResult = await post_service.bulk_import(
+        iter_records(request.stream(), file_format), default_author_id=current_user.id,
+    )
+    return import_result.data
+
+
 @post_router.patch("/", response_model=UpdatedPostResponse, tags=['Posts'])
 async def update(
         post_id: int,
@@ -61,7 +164,7 @@ async def update(
         post_service: PostService = Depends(get_post_service_sqlalchemy),
 ) -> UpdatedPostResponse:
 
-    update_result: PostServiceResult = await post_service.update(
+    update_result: ServiceResult = await post_service.update(
         post_id=post_id, data_to_update=data_to_update, current_user=current_user,
     )
 
@@ -80,7 +183,7 @@ async def delete(
         current_user: User = Depends(apps.user.depends.get_current_user_from_token),
         post_service: PostService = Depends(get_post_service_sqlalchemy),
 ) -> Response:
-    delete_result: PostServiceResult = await post_service.delete(post_id=post_id, current_user=current_user)
+    delete_result: ServiceResult = await post_service.delete(post_id=post_id, current_user=current_user)
 
     if not delete_result.success:
         raise HTTPException(
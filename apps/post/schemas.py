@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, field_validator
@@ -32,6 +32,39 @@ class PostCreate(BaseModel):
         return text
 
 
+class PostImportRow(PostCreate):
+    author_id: int | None = None
+    published_at: datetime | None = None
+
+    @field_validator("title", "text", "short_description")
+    def without_nul(cls, value: str):
+        # PostgreSQL text cannot store NUL, COPY would reject the whole batch over it.
+        if "\x00" in value:
+            raise ValueError("NUL characters are not allowed")
+        return value
+
+    @field_validator("author_id", "published_at", mode="before")
+    def empty_as_none(cls, value: Any):
+        return None if value == "" else value
+
+    @field_validator("published_at")
+    def naive_as_utc(cls, published_at: datetime | None):
+        if published_at is not None and published_at.tzinfo is None:
+            return published_at.replace(tzinfo=timezone.utc)
+        return published_at
+
+
+class PostImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class PostImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[PostImportError] = []
+
+
 class ShowPost(BaseModel):
     id: int
     author_id: int
@@ -44,6 +77,23 @@ class ShowPost(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PostRef(BaseModel):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PostSummary(BaseModel):
+    id: int
+    author_id: int
+    title: str
+    short_description: str
+    slug: str
+    published_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UpdatePostRequest(BaseModel):
     title: str = None
     text: str = None
@@ -57,10 +107,3 @@ class UpdatedPostResponse(BaseModel):
     short_description: str
 
     model_config = ConfigDict(from_attributes=True)
-
-
-class PostServiceResult(BaseModel):
-    success: bool
-    status_code: int
-    detail: str = None
-    data: Any = None
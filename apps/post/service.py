@@ -1,84 +1,200 @@
-from fastapi import status
+from typing import AsyncIterator, Sequence
 
-from apps.post.schemas import PostCreate, PostServiceResult, UpdatePostRequest
+from fastapi import status
+from pydantic import ValidationError
+from sqlalchemy import Row
+
+from apps.post.models import Post
+from apps.post.schemas import (PostCreate, PostImportError, PostImportReport,
+                               PostImportRow, PostRef, ShowPost,
+                               UpdatePostRequest)
+from apps.results import ServiceResult
 from apps.user.models import User
+from caching.namespaces import POSTS_NAMESPACE, invalidate
+from caching.tiered import TieredCache
+from config import (BULK_IMPORT_BATCH_SIZE, BULK_IMPORT_MAX_REPORTED_ERRORS,
+                    EXPORT_BATCH_SIZE)
+from db.pagination import InvalidCursorError, KeysetPage
+
+from .repository.base import PostBatchRejectedError, PostRepository
 
-from ..user import security
-from .models import Post
-from .repository.base import PostRepository
+# (row number, parsed record or None, parse error or None)
+ImportRecord = tuple[int, dict | None, str | None]
 
 
 class PostService:
-    def __init__(self, post_repository: PostRepository):
+    def __init__(
+            self, post_repository: PostRepository, post_cache: TieredCache[ShowPost],
+            post_slug_cache: TieredCache[PostRef],
+    ):
         self._post_repository = post_repository
+        self._post_cache = post_cache
+        self._post_slug_cache = post_slug_cache
 
-    async def create(self, post: PostCreate, current_user: User) -> PostServiceResult:
+    async def create(self, post: PostCreate, current_user: User) -> ServiceResult[Post]:
         new_post = await self._post_repository.create(post=post, current_user=current_user)
-        return PostServiceResult(success=True, status_code=status.HTTP_200_OK, data=new_post)
+        await invalidate(POSTS_NAMESPACE)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=new_post)
+
+    async def bulk_import(
+            self, records: AsyncIterator[ImportRecord], default_author_id: int,
+            batch_size: int = BULK_IMPORT_BATCH_SIZE,
+    ) -> ServiceResult[PostImportReport]:
+        report = PostImportReport()
+        batch: list[tuple[int, PostImportRow]] = []
+        try:
+            async for row, record, error in records:
+                if error is not None:
+                    _report_errors(report, row, [error])
+                    continue
+                try:
+                    post = PostImportRow.model_validate(record)
+                except ValidationError as exc:
+                    _report_errors(report, row, [
+                        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in exc.errors()
+                    ])
+                    continue
+                if post.author_id is None:
+                    post.author_id = default_author_id
+                batch.append((row, post))
+                if len(batch) >= batch_size:
+                    await self._import_batch(batch, report)
+                    batch = []
+            if batch:
+                await self._import_batch(batch, report)
+        finally:
+            # Batches already committed stay imported even if a later one, or the upload, fails.
+            if report.imported:
+                await invalidate(POSTS_NAMESPACE)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=report)
+
+    async def get_post(self, post_id: int) -> ServiceResult[ShowPost]:
+        post = await self._post_cache.get_or_load(post_id, lambda: self._load_post(post_id=post_id))
+        if not post:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND, detail="Post not found.",
+            )
 
-    async def get_post(self, post_id: int) -> PostServiceResult:
-        post = await self._post_repository.get_post(post_id=post_id)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=post)
+
+    async def get_by_slug(self, slug: str) -> ServiceResult[ShowPost]:
+        post = None
+        post_ref = await self._post_slug_cache.get_or_load(slug, lambda: self._load_post_ref(slug=slug))
+        if post_ref:
+            post = await self._post_cache.get_or_load(post_ref.id, lambda: self._load_post(post_id=post_ref.id))
+            if not post or post.slug != slug:
+                # The slug moved to another post or was freed since it was cached.
+                await self._post_slug_cache.invalidate(slug)
+                post = await self._post_repository.get_by_slug(slug=slug)
         if not post:
-            return PostServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_404_NOT_FOUND, detail="Post not found.",
             )
 
-        return PostServiceResult(success=True, status_code=status.HTTP_200_OK, data=post)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=post)
+
+    async def get_page(self, size: int, cursor: str | None = None) -> ServiceResult[KeysetPage]:
+        try:
+            page = await self._post_repository.get_page(size=size, cursor=cursor)
+        except InvalidCursorError:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.",
+            )
+
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=page)
+
+    async def get_page_by_user_id(
+            self, user_id: int, size: int, cursor: str | None = None,
+    ) -> ServiceResult[KeysetPage]:
+        try:
+            page = await self._post_repository.get_page_by_user_id(user_id=user_id, size=size, cursor=cursor)
+        except InvalidCursorError:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.",
+            )
+
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=page)
+
+    async def export(self, batch_size: int = EXPORT_BATCH_SIZE) -> ServiceResult[AsyncIterator[Sequence[Row]]]:
+        return ServiceResult(
+            success=True, status_code=status.HTTP_200_OK, data=self._post_repository.export(batch_size=batch_size),
+        )
 
-    async def get_by_user_id(self, user_id: int) -> PostServiceResult:
-        user_posts = await self._post_repository.get_by_user_id(user_id=user_id)
-        return PostServiceResult(success=True, status_code=status.HTTP_200_OK, data=user_posts)
+    async def search(self, query_text: str, size: int, cursor: str | None = None) -> ServiceResult[KeysetPage]:
+        try:
+            page = await self._post_repository.search(query_text=query_text, size=size, cursor=cursor)
+        except InvalidCursorError:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.",
+            )
 
-    async def get_all(self) -> PostServiceResult:
-        posts = await self._post_repository.get_all()
-        return PostServiceResult(success=True, status_code=status.HTTP_200_OK, data=posts)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=page)
 
-    async def update(self, post_id: int, data_to_update: UpdatePostRequest, current_user: User) -> PostServiceResult:
+    async def update(self, post_id: int, data_to_update: UpdatePostRequest, current_user: User) -> ServiceResult[Post]:
         updated_post_params = data_to_update.model_dump(exclude_none=True)
 
         if not updated_post_params:
-            return PostServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="At least one parameter for user update info should be provided",
             )
 
-        post = await self._get_post_or_404(post_id=post_id)
-        if isinstance(post, PostServiceResult):
-            return post
-
-        if post.author_id != current_user.id:
-            if not security.check_user_permissions(target_user=post.author, current_user=current_user):
-                return PostServiceResult(
-                    success=False, status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Forbidden.",
-                )
-
-        updated_post = await self._post_repository.update(
-            post_id=post_id, updated_post_params=updated_post_params
+        updated_post = await self._post_repository.update_if_permitted(
+            post_id=post_id, current_user=current_user, updated_post_params=updated_post_params,
         )
+        if updated_post is None:
+            return await self._not_found_or_forbidden(post_id=post_id)
 
-        return PostServiceResult(success=True, status_code=status.HTTP_200_OK, data=updated_post)
+        await self._post_cache.invalidate(post_id)
+        await invalidate(POSTS_NAMESPACE)
 
-    async def delete(self, post_id: int, current_user: User) -> PostServiceResult:
-        post = await self._get_post_or_404(post_id=post_id)
-        if isinstance(post, PostServiceResult):
-            return post
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=updated_post)
 
-        if post.author_id != current_user.id:
-            if not security.check_user_permissions(target_user=post.author, current_user=current_user):
-                return PostServiceResult(
-                    success=False, status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Forbidden.",
-                )
+    async def delete(self, post_id: int, current_user: User) -> ServiceResult[None]:
+        if not await self._post_repository.delete_if_permitted(post_id=post_id, current_user=current_user):
+            return await self._not_found_or_forbidden(post_id=post_id)
 
-        await self._post_repository.delete(post_id=post_id)
+        await self._post_cache.invalidate(post_id)
+        await invalidate(POSTS_NAMESPACE)
 
-        return PostServiceResult(success=True, status_code=status.HTTP_204_NO_CONTENT)
+        return ServiceResult(success=True, status_code=status.HTTP_204_NO_CONTENT)
 
-    async def _get_post_or_404(self, post_id: int) -> Post | PostServiceResult:
+    async def _load_post(self, post_id: int) -> ShowPost | None:
         post = await self._post_repository.get_post(post_id=post_id)
-        if not post:
-            return PostServiceResult(
-                success=False, status_code=status.HTTP_404_NOT_FOUND, detail="Post not found."
+        return ShowPost.model_validate(post) if post else None
+
+    async def _import_batch(self, batch: Sequence[tuple[int, PostImportRow]], report: PostImportReport) -> None:
+        author_ids = await self._post_repository.existing_author_ids(post.author_id for _, post in batch)
+        accepted = []
+        for row, post in batch:
+            if post.author_id in author_ids:
+                accepted.append((row, post))
+            else:
+                _report_errors(report, row, [f"author_id: User with id {post.author_id} not found."])
+        if not accepted:
+            return
+        try:
+            report.imported += await self._post_repository.bulk_create([post for _, post in accepted])
+        except PostBatchRejectedError as exc:
+            for row, _ in accepted:
+                _report_errors(report, row, [str(exc)])
+
+    async def _load_post_ref(self, slug: str) -> PostRef | None:
+        post = await self._post_repository.get_by_slug(slug=slug)
+        return PostRef.model_validate(post) if post else None
+
+    async def _not_found_or_forbidden(self, post_id: int) -> ServiceResult[None]:
+        if not await self._post_repository.exists(post_id=post_id):
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND, detail=f"Post with id {post_id} not found."
             )
-        return post
+        return ServiceResult(
+            success=False, status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden.",
+        )
+
+
+def _report_errors(report: PostImportReport, row: int, errors: list[str]) -> None:
+    report.failed += 1
+    if len(report.errors) < BULK_IMPORT_MAX_REPORTED_ERRORS:
+        report.errors.append(PostImportError(row=row, errors=errors))
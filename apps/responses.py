@@ -0,0 +1,42 @@
+from typing import Any
+
+from fastapi import Response
+from fastapi_cache.coder import JsonCoder
+from pydantic import TypeAdapter
+
+from config import FAST_JSON_RESPONSES
+
+RAW_JSON_PREFIX = "raw:"
+
+
+class PreserializedResponse(Response):
+    media_type = "application/json"
+
+
+def respond(adapter: TypeAdapter, value: Any) -> Any:
+    """Serialize `value` through `adapter` when the fast path is enabled.
+
+    FastAPI skips `response_model` validation and `jsonable_encoder` for a
+    returned `Response`, so rows are only validated from their attributes and
+    then dumped to JSON, both by pydantic-core. With the fast path off `value`
+    is returned as is.
+    """
+    if not FAST_JSON_RESPONSES:
+        return value
+    return PreserializedResponse(adapter.dump_json(adapter.validate_python(value, from_attributes=True), by_alias=True))
+
+
+class ResponseCoder(JsonCoder):
+    """Stores pre-serialized responses verbatim, so cache hits are not re-validated either."""
+
+    @classmethod
+    def encode(cls, value: Any) -> str:
+        if isinstance(value, PreserializedResponse):
+            return RAW_JSON_PREFIX + value.body.decode()
+        return super().encode(value)
+
+    @classmethod
+    def decode(cls, value: str) -> Any:
+        if value.startswith(RAW_JSON_PREFIX):
+            return PreserializedResponse(value[len(RAW_JSON_PREFIX):])
+        return super().decode(value)
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class ServiceResult(Generic[T]):
+    """Outcome of a service call, unwrapped by the router straight away.
+
+    A plain slotted dataclass rather than a pydantic model: the payload is
+    validated by the endpoint's response model anyway, so building the result
+    should cost no more than a tuple.
+    """
+    success: bool
+    status_code: int
+    detail: str | None = None
+    data: T | None = None
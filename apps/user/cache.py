@@ -0,0 +1,13 @@
+from caching.tiered import TieredCache
+from config import PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS
+
+from .schemas import ShowUser
+
+principal_cache = TieredCache(
+    name="principal",
+    model=ShowUser,
+    ttl=PRINCIPAL_CACHE_TTL_SECONDS,
+    local_ttl=PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+    max_bytes=PRINCIPAL_CACHE_MAX_ENTRIES * 512,
+)
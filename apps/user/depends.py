@@ -4,16 +4,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from config import ALGORITHM, SECRET_KEY
-from db.session import get_db
+from db.session import get_db, get_read_db
 
+from .cache import principal_cache
 from .repository.sqlalchemy import SQLAlchemyUserRepository
+from .schemas import ShowUser
 from .security import oauth2_scheme
 from .service import UserService
 
 
-async def get_user_service_sqlalchemy(db_session: AsyncSession = Depends(get_db)) -> UserService:
-    sqlalchemy_user_repository = SQLAlchemyUserRepository(db_session=db_session)
-    return UserService(user_repository=sqlalchemy_user_repository)
+async def get_user_service_sqlalchemy(
+        db_session: AsyncSession = Depends(get_db), read_session: AsyncSession = Depends(get_read_db),
+) -> UserService:
+    sqlalchemy_user_repository = SQLAlchemyUserRepository(db_session=db_session, read_session=read_session)
+    return UserService(user_repository=sqlalchemy_user_repository, principal_cache=principal_cache)
 
 
 async def get_current_user_from_token(
@@ -34,7 +38,16 @@ async def get_current_user_from_token(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    result = await user_service.get_by_username(username)
-    if result.data is None:
+    user = await user_service.get_principal(username)
+    if user is None:
         raise credentials_exception
-    return result.data
+    return user
+
+
+async def get_current_admin(current_user: ShowUser = Depends(get_current_user_from_token)) -> ShowUser:
+    if not (current_user.is_admin or current_user.is_superuser):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden.",
+        )
+    return current_user
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from config import PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS
+
+from . import security
+
+HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth", "Password hashing jobs waiting for or running in the executor.",
+)
+HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Password hashing jobs refused because the queue was full.", ["operation"],
+)
+HASH_LATENCY = Histogram(
+    "password_hash_seconds", "Time to hash or verify a password, queueing included.", ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0),
+)
+
+
+class PasswordHasherBusyError(Exception):
+    def __init__(self, max_pending: int):
+        super().__init__(f"More than {max_pending} password hashing jobs pending")
+        self.max_pending = max_pending
+
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool so it never blocks the event loop.
+
+    One job per worker is handed to the pool at a time, later callers wait on
+    the semaphore. At most `max_pending` jobs wait or run, beyond that callers
+    get PasswordHasherBusyError at once instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_workers)
+        self._pending = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers, mp_context=get_context("spawn"))
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable, *args: Any) -> Any:
+        if self._pending >= self._max_pending:
+            HASH_REJECTED.labels(operation=operation).inc()
+            raise PasswordHasherBusyError(self._max_pending)
+        self._pending += 1
+        HASH_QUEUE_DEPTH.inc()
+        started_at = time.perf_counter()
+        try:
+            async with self._slots:
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+            HASH_QUEUE_DEPTH.dec()
+            HASH_LATENCY.labels(operation=operation).observe(time.perf_counter() - started_at)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", security.get_hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", security.verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(max_workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from db.session import Base
@@ -17,3 +17,10 @@ class User(Base):
     is_verified_email: bool = Column(Boolean, default=False, nullable=False)
 
     posts = relationship("Post", back_populates="author")
+
+    __table_args__ = (
+        Index("ix_users_username_pattern", "username", postgresql_ops={"username": "varchar_pattern_ops"}),
+        Index(
+            "ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
@@ -1,8 +1,48 @@
 from abc import ABC, abstractmethod
-from typing import Sequence
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Mapping, Sequence
 
 from apps.user.models import User
-from apps.user.schemas import UserCreate
+from apps.user.schemas import UserCreate, UserListFilter
+from db.pagination import KeysetPage
+
+
+class UserAlreadyExistsError(Exception):
+    def __init__(self, field: str):
+        super().__init__(f"User with this {field} already exists")
+        self.field = field
+
+
+@dataclass
+class UserUpdateOutcome:
+    old_username: str | None
+    allowed: bool
+    email_taken: bool
+    username_taken: bool
+    updated_user: Any = None
+
+
+@dataclass
+class UserUpdatePermission:
+    username: str | None
+    allowed: bool = False
+
+
+@dataclass
+class UserDeleteOutcome:
+    username: str | None
+    allowed: bool = False
+    deleted: bool = False
+
+
+@dataclass
+class UserFlagOutcome:
+    # Flags as the guarded update found them, they tell why its precondition failed.
+    found: bool
+    was_admin: bool = False
+    was_superuser: bool = False
+    was_verified_email: bool = False
+    updated_user: Any = None
 
 
 class UserRepository(ABC):
@@ -11,11 +51,11 @@ class UserRepository(ABC):
         ...
 
     @abstractmethod
-    async def get_user(self, user_id: int) -> User | None:
+    async def get_user(self, user_id: int, consistent: bool = False) -> User | None:
         ...
 
     @abstractmethod
-    async def get_by_username(self, username: str) -> User | None:
+    async def get_by_username(self, username: str, consistent: bool = False) -> User | None:
         ...
 
     @abstractmethod
@@ -23,17 +63,35 @@ class UserRepository(ABC):
         ...
 
     @abstractmethod
-    async def update(self, user_id: int, updated_user_params: dict) -> User | None:
+    async def get_page(self, filters: UserListFilter, size: int, cursor: str | None = None) -> KeysetPage:
+        ...
+
+    @abstractmethod
+    async def search(self, prefix: str, limit: int) -> Sequence[Mapping[str, Any]]:
+        ...
+
+    @abstractmethod
+    def export(self, batch_size: int) -> AsyncIterator[Sequence[Any]]:
+        ...
+
+    @abstractmethod
+    async def verify_email(self, username: str) -> UserFlagOutcome:
+        ...
+
+    @abstractmethod
+    async def set_admin(self, user_id: int, is_admin: bool) -> UserFlagOutcome:
         ...
 
     @abstractmethod
-    async def delete(self, user_id: int) -> None:
+    async def update_permission(self, user_id: int, current_user: User) -> UserUpdatePermission:
         ...
 
     @abstractmethod
-    async def check_duplicate_email(self, email: str) -> bool:
+    async def update_if_permitted(
+            self, user_id: int, current_user: User, updated_user_params: dict,
+    ) -> UserUpdateOutcome:
         ...
 
     @abstractmethod
-    async def check_duplicate_username(self, username: str) -> bool:
+    async def delete_if_permitted(self, user_id: int, current_user: User) -> UserDeleteOutcome:
         ...
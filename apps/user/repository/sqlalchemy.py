@@ -1,65 +1,220 @@
-from typing import Sequence
+from typing import Any, AsyncIterator, Sequence
 
-from sqlalchemy import and_, select, update
+from sqlalchemy import (ColumnElement, RowMapping, exists, false, func, insert,
+                        or_, select, true, update)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.user import security
+from apps.user.hashing import password_hasher
 from apps.user.models import User
-from apps.user.schemas import UserCreate
+from apps.user.schemas import UserCreate, UserListFilter
+from db.pagination import KeysetPage, paginate_keyset
+from db.streaming import stream_snapshot
+from tasks.outbox import VERIFICATION_EMAIL_TASK, enqueue_from
 
-from .base import UserRepository
+from .base import (UserAlreadyExistsError, UserDeleteOutcome, UserFlagOutcome,
+                   UserRepository, UserUpdateOutcome, UserUpdatePermission)
+
+UNIQUE_CONSTRAINT_FIELDS = {
+    "users_email_key": "email",
+    "users_username_key": "username",
+}
+
+SHOW_USER_COLUMNS = (
+    User.id, User.username, User.email, User.is_active, User.is_admin, User.is_superuser, User.is_verified_email,
+)
 
 
 class SQLAlchemyUserRepository(UserRepository):
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, read_session: AsyncSession | None = None):
         self._db_session = db_session
+        self._read_session = read_session or db_session
 
     async def create(self, user: UserCreate) -> User:
-        new_user = User(
+        # One statement writes the user and queues its verification email, atomically even in autocommit.
+        # Built on Core tables: ORM-compiled selects drop CTEs attached with add_cte().
+        new_user = insert(User.__table__).values(
             username=user.username,
             email=user.email,
-            hashed_password=security.get_hash_password(user.password),
-        )
-        self._db_session.add(new_user)
+            hashed_password=await password_hasher.hash(user.password),
+        ).returning(*User.__table__.c).cte("new_user")
+        verification_email = enqueue_from(
+            VERIFICATION_EMAIL_TASK, new_user.c.username, new_user.c.email,
+        ).cte("verification_email")
+        query = select(User).from_statement(select(*new_user.c).add_cte(verification_email))
+        try:
+            result = await self._db_session.execute(query)
+        except IntegrityError as exc:
+            await self._db_session.rollback()
+            field = _conflicting_field(exc)
+            if field is None:
+                raise
+            raise UserAlreadyExistsError(field) from exc
+        created_user = result.scalars().one()
         await self._db_session.commit()
-        return new_user
+        return created_user
 
-    async def get_user(self, user_id: int) -> User | None:
+    async def get_user(self, user_id: int, consistent: bool = False) -> User | None:
         query = select(User).filter_by(id=user_id)
-        result = await self._db_session.execute(query)
+        result = await (self._db_session if consistent else self._read_session).execute(query)
         return result.scalars().first()
 
-    async def get_by_username(self, username: str) -> User | None:
-        query = select(User).filter_by(username=username)
-        result = await self._db_session.execute(query)
-        return result.scalars().first()
+    async def get_by_username(self, username: str, consistent: bool = False) -> User | None:
+        # Login and the principal load come right before bcrypt work, so the read transaction ends here:
+        # behind a transaction-mode pooler it would otherwise pin a server connection for the whole hash.
+        db_session = self._db_session if consistent else self._read_session
+        result = await db_session.execute(select(User).filter_by(username=username))
+        user = result.scalars().first()
+        await db_session.commit()
+        return user
 
     async def get_all(self) -> Sequence[User]:
         query = select(User)
-        result = await self._db_session.execute(query)
+        result = await self._read_session.execute(query)
         return result.scalars().all()
 
-    async def update(self, user_id: int, updated_user_params: dict) -> User | None:
-        query = update(User).filter_by(id=user_id).values(**updated_user_params).returning(User)
-        result = await self._db_session.execute(query)
-        return result.scalars().first()
+    async def get_page(self, filters: UserListFilter, size: int, cursor: str | None = None) -> KeysetPage:
+        query = select(*SHOW_USER_COLUMNS).filter_by(
+            **filters.model_dump(exclude={"username_prefix"}, exclude_none=True)
+        )
+        if filters.username_prefix:
+            query = query.where(User.username.startswith(filters.username_prefix, autoescape=True))
+        return await paginate_keyset(
+            self._read_session, query, keys=(User.id,), size=size, cursor=cursor, descending=False, scalars=False,
+        )
 
-    async def delete(self, user_id: int) -> None:
+    async def search(self, prefix: str, limit: int) -> Sequence[RowMapping]:
+        # Exact prefixes come from the varchar_pattern_ops btree, fuzzy ones from the trigram GIN index.
+        # Mappings rather than rows: the cache JSON-encodes them as objects the response model reads back.
+        is_prefix = User.username.startswith(prefix, autoescape=True)
         query = (
+            select(*SHOW_USER_COLUMNS)
+            .where(User.is_active, or_(is_prefix, User.username.bool_op("%>")(prefix)))
+            .order_by(is_prefix.desc(), func.word_similarity(prefix, User.username).desc(), User.username)
+            .limit(limit)
+        )
+        result = await self._read_session.execute(query)
+        return result.mappings().all()
+
+    async def export(self, batch_size: int) -> AsyncIterator[Sequence[Any]]:
+        query = select(*SHOW_USER_COLUMNS).order_by(User.id)
+        async for rows in stream_snapshot(self._read_session, query, batch_size=batch_size):
+            yield rows
+
+    async def verify_email(self, username: str) -> UserFlagOutcome:
+        return await self._update_guarded(
+            User.username == username, ~User.is_verified_email, {"is_verified_email": True},
+        )
+
+    async def set_admin(self, user_id: int, is_admin: bool) -> UserFlagOutcome:
+        # Superuser privileges are never changed through the admin flag.
+        return await self._update_guarded(
+            User.id == user_id, ~User.is_superuser & (User.is_admin != is_admin), {"is_admin": is_admin},
+        )
+
+    async def update_permission(self, user_id: int, current_user: User) -> UserUpdatePermission:
+        query = select(User.username, _update_permitted(current_user).label("allowed")).where(User.id == user_id)
+        result = await self._db_session.execute(query)
+        row = result.first()
+        # Ends the read transaction before the caller hashes the new password.
+        await self._db_session.commit()
+        if row is None:
+            return UserUpdatePermission(username=None)
+        return UserUpdatePermission(username=row.username, allowed=bool(row.allowed))
+
+    async def update_if_permitted(
+            self, user_id: int, current_user: User, updated_user_params: dict,
+    ) -> UserUpdateOutcome:
+        email, username = updated_user_params.get("email"), updated_user_params.get("username")
+        permitted = _update_permitted(current_user)
+
+        target = select(User.username, permitted.label("allowed")).where(User.id == user_id).cte("target")
+        conflicts = select(
+            exists().where(User.email == email).label("email_taken") if email else false().label("email_taken"),
+            exists().where(User.username == username).label("username_taken") if username
+            else false().label("username_taken"),
+        ).cte("conflicts")
+        updated = (
             update(User)
-            .where(and_(User.id == user_id, User.is_active == True))
+            .where(User.id == user_id, permitted, ~conflicts.c.email_taken, ~conflicts.c.username_taken)
+            .values(**updated_user_params)
+            .returning(User.id, User.username, User.email)
+            .cte("updated")
+        )
+        query = select(
+            target.c.username.label("old_username"), target.c.allowed,
+            conflicts.c.email_taken, conflicts.c.username_taken,
+            updated.c.id, updated.c.username, updated.c.email,
+        ).select_from(conflicts.outerjoin(target, true()).outerjoin(updated, true()))
+
+        try:
+            result = await self._db_session.execute(query)
+        except IntegrityError as exc:
+            await self._db_session.rollback()
+            field = _conflicting_field(exc)
+            if field is None:
+                raise
+            raise UserAlreadyExistsError(field) from exc
+
+        row = result.one()
+        await self._db_session.commit()
+        return UserUpdateOutcome(
+            old_username=row.old_username,
+            allowed=bool(row.allowed),
+            email_taken=row.email_taken,
+            username_taken=row.username_taken,
+            updated_user=row if row.id is not None else None,
+        )
+
+    async def _update_guarded(self, key: ColumnElement, guard: ColumnElement, values: dict) -> UserFlagOutcome:
+        # Both CTEs see the same snapshot: `target` is the row before the update, whether or not the guard held.
+        target = select(User.is_admin, User.is_superuser, User.is_verified_email).where(key).cte("target")
+        updated = update(User).where(key, guard).values(**values).returning(*SHOW_USER_COLUMNS).cte("updated")
+        query = select(
+            target.c.is_admin.label("was_admin"), target.c.is_superuser.label("was_superuser"),
+            target.c.is_verified_email.label("was_verified_email"), *updated.c,
+        ).select_from(target.outerjoin(updated, true()))
+
+        result = await self._db_session.execute(query)
+        row = result.first()
+        await self._db_session.commit()
+        if row is None:
+            return UserFlagOutcome(found=False)
+        return UserFlagOutcome(
+            found=True,
+            was_admin=row.was_admin,
+            was_superuser=row.was_superuser,
+            was_verified_email=row.was_verified_email,
+            updated_user=row if row.id is not None else None,
+        )
+
+    async def delete_if_permitted(self, user_id: int, current_user: User) -> UserDeleteOutcome:
+        permitted = security.permission_clause(current_user=current_user)
+        target = select(User.username, permitted.label("allowed")).where(User.id == user_id).cte("target")
+        deleted = (
+            update(User)
+            .where(User.id == user_id, User.is_active, permitted)
             .values(is_active=False)
             .returning(User.id)
+            .cte("deleted")
+        )
+        query = select(target.c.username, target.c.allowed, deleted.c.id).select_from(
+            target.outerjoin(deleted, true())
         )
+
         result = await self._db_session.execute(query)
-        return result.scalars().first()
+        row = result.first()
+        await self._db_session.commit()
+        if row is None:
+            return UserDeleteOutcome(username=None)
+        return UserDeleteOutcome(username=row.username, allowed=bool(row.allowed), deleted=row.id is not None)
 
-    async def check_duplicate_email(self, email: str) -> bool:
-        query = select(User).filter_by(email=email).exists()
-        result = await self._db_session.execute(query.select())
-        return result.scalars().first()
 
-    async def check_duplicate_username(self, username: str) -> bool:
-        query = select(User).filter_by(username=username).exists()
-        result = await self._db_session.execute(query.select())
-        return result.scalars().first()
+def _update_permitted(current_user: User) -> ColumnElement[bool]:
+    return or_(User.id == current_user.id, security.permission_clause(current_user=current_user))
+
+
+def _conflicting_field(exc: IntegrityError) -> str | None:
+    constraint_name = getattr(exc.orig.__cause__, "constraint_name", None)
+    return UNIQUE_CONSTRAINT_FIELDS.get(constraint_name)
@@ -1,24 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi_cache.decorator import cache
-from fastapi_pagination import Page, paginate
+from fastapi_pagination.cursor import CursorPage
+from pydantic import TypeAdapter
 
 import apps.user.depends
+from apps.export import ExportFormat, export_response
+from apps.pagination import KeysetParams
+from apps.responses import respond
+from apps.results import ServiceResult
 from apps.user.depends import get_user_service_sqlalchemy
 from apps.user.models import User
+from apps.user.repository.sqlalchemy import SHOW_USER_COLUMNS
 from apps.user.schemas import (ShowUser, Token, UpdatedUserResponse,
-                               UpdateUserRequest, UserCreate,
-                               UserServiceResult)
+                               UpdateUserRequest, UserCreate, UserListFilter)
 from apps.user.service import UserService
+from caching.namespaces import USERS_NAMESPACE, cache_list
+from config import USER_SEARCH_CACHE_SECONDS
 
 user_router = APIRouter(
     prefix='/users',
 )
 
+SHOW_USER_ADAPTER = TypeAdapter(ShowUser)
+SHOW_USER_LIST_ADAPTER = TypeAdapter(list[ShowUser])
+SHOW_USER_PAGE_ADAPTER = TypeAdapter(CursorPage[ShowUser])
+
 
 @user_router.get("/", response_model=ShowUser, tags=['Users'])
 async def get_user(user_id: int, user_service: UserService = Depends(get_user_service_sqlalchemy)) -> ShowUser:
-    get_user_result: UserServiceResult = await user_service.get_user(user_id=user_id)
+    get_user_result: ServiceResult = await user_service.get_user(user_id=user_id)
 
     if not get_user_result.success:
         raise HTTPException(
@@ -26,12 +37,12 @@ async def get_user(user_id: int, user_service: UserService = Depends(get_user_se
             detail=get_user_result.detail,
         )
 
-    return get_user_result.data
+    return respond(SHOW_USER_ADAPTER, get_user_result.data)
 
 
 @user_router.get("/username", response_model=ShowUser, tags=['Users'])
 async def get_by_username(username: str, user_service: UserService = Depends(get_user_service_sqlalchemy)) -> ShowUser:
-    get_user_result: UserServiceResult = await user_service.get_by_username(username=username)
+    get_user_result: ServiceResult = await user_service.get_by_username(username=username)
 
     if not get_user_result.success:
         raise HTTPException(
@@ -39,19 +50,58 @@ async def get_by_username(username: str, user_service: UserService = Depends(get
             detail=get_user_result.detail,
         )
 
-    return get_user_result.data
+    return respond(SHOW_USER_ADAPTER, get_user_result.data)
+
+
+@user_router.get("/list", response_model=CursorPage[ShowUser], tags=['Users'])
+@cache_list(USERS_NAMESPACE)
+async def get_all(
+        filters: UserListFilter = Depends(), params: KeysetParams = Depends(),
+        user_service: UserService = Depends(get_user_service_sqlalchemy),
+) -> CursorPage[ShowUser]:
+    page_result: ServiceResult = await user_service.get_page(
+        filters=filters, size=params.size, cursor=params.cursor,
+    )
 
+    if not page_result.success:
+        raise HTTPException(
+            status_code=page_result.status_code,
+            detail=page_result.detail,
+        )
 
-@user_router.get("/list", response_model=Page[ShowUser], tags=['Users'])
-@cache(expire=60)
-async def get_all(user_service: UserService = Depends(get_user_service_sqlalchemy)):
-    users_result: UserServiceResult = await user_service.get_all()
-    return paginate(users_result.data)
+    page = page_result.data
+    return respond(
+        SHOW_USER_PAGE_ADAPTER,
+        CursorPage[ShowUser](items=page.items, next_page=page.next_cursor, previous_page=page.previous_cursor),
+    )
+
+
+@user_router.get("/export", tags=['Users'])
+async def export(
+        file_format: ExportFormat = Query("ndjson", alias="format"),
+        user_service: UserService = Depends(get_user_service_sqlalchemy),
+        current_user: User = Depends(apps.user.depends.get_current_admin),
+) -> StreamingResponse:
+    export_result: ServiceResult = await user_service.export()
+    return export_response(
+        export_result.data, columns=[column.key for column in SHOW_USER_COLUMNS], file_format=file_format,
+        filename="users",
+    )
+
+
+@user_router.get("/search", response_model=list[ShowUser], tags=['Users'])
+@cache_list(USERS_NAMESPACE, expire=USER_SEARCH_CACHE_SECONDS)
+async def search(
+        prefix: str = Query(min_length=1, max_length=50), limit: int = Query(10, ge=1, le=50),
+        user_service: UserService = Depends(get_user_service_sqlalchemy),
+) -> list[ShowUser]:
+    search_result: ServiceResult = await user_service.search(prefix=prefix, limit=limit)
+    return respond(SHOW_USER_LIST_ADAPTER, search_result.data)
 
 
 @user_router.post("/", response_model=ShowUser, tags=['Users'])
 async def create_user(user: UserCreate, user_service: UserService = Depends(get_user_service_sqlalchemy)) -> ShowUser:
-    create_result: UserServiceResult = await user_service.create(user=user)
+    create_result: ServiceResult = await user_service.create(user=user)
 
     if not create_result.success:
         raise HTTPException(
@@ -68,7 +118,7 @@ async def update(
         current_user: User = Depends(apps.user.depends.get_current_user_from_token),
         user_service: UserService = Depends(get_user_service_sqlalchemy),
 ) -> UpdatedUserResponse:
-    update_result: UserServiceResult = await user_service.update(
+    update_result: ServiceResult = await user_service.update(
         user_id=user_id, data_to_update=data_to_update, current_user=current_user
     )
 
@@ -87,7 +137,7 @@ async def delete(
         current_user: User = Depends(apps.user.depends.get_current_user_from_token),
         user_service: UserService = Depends(get_user_service_sqlalchemy),
 ) -> Response:
-    delete_result: UserServiceResult = await user_service.delete(user_id=user_id, current_user=current_user)
+    delete_result: ServiceResult = await user_service.delete(user_id=user_id, current_user=current_user)
 
     if not delete_result.success:
         raise HTTPException(
@@ -104,7 +154,7 @@ async def add_admin_privilege(
         current_user: User = Depends(apps.user.depends.get_current_user_from_token),
         user_service: UserService = Depends(get_user_service_sqlalchemy),
 ):
-    add_priv_result: UserServiceResult = await user_service.add_admin_privilege(
+    add_priv_result: ServiceResult = await user_service.add_admin_privilege(
         user_id=user_id, current_user=current_user,
     )
 
@@ -123,7 +173,7 @@ async def remove_admin_privilege(
         current_user: User = Depends(apps.user.depends.get_current_user_from_token),
         user_service: UserService = Depends(get_user_service_sqlalchemy),
 ):
-    remove_priv_result: UserServiceResult = await user_service.remove_admin_privilege(
+    remove_priv_result: ServiceResult = await user_service.remove_admin_privilege(
         user_id=user_id, current_user=current_user,
     )
 
@@ -141,7 +191,7 @@ async def login_for_access_token(
         form_data: OAuth2PasswordRequestForm = Depends(),
         user_service: UserService = Depends(get_user_service_sqlalchemy),
 ):
-    login_result: UserServiceResult = await user_service.login_for_access_token(
+    login_result: ServiceResult = await user_service.login_for_access_token(
         username=form_data.username, password=form_data.password,
     )
 
@@ -156,7 +206,7 @@ async def login_for_access_token(
 
 @user_router.get('/verification_email', status_code=status.HTTP_200_OK, tags=['Verification'])
 async def email_verification(token: str, user_service: UserService = Depends(get_user_service_sqlalchemy)) -> Response:
-    verification_result: UserServiceResult = await user_service.email_verification(token=token)
+    verification_result: ServiceResult = await user_service.email_verification(token=token)
 
     if not verification_result.success:
         raise HTTPException(
@@ -1,4 +1,3 @@
-from typing import Any
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
@@ -29,6 +28,13 @@ class ShowUser(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserListFilter(BaseModel):
+    is_active: bool = None
+    is_admin: bool = None
+    is_verified_email: bool = None
+    username_prefix: str = None
+
+
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
@@ -76,10 +82,3 @@ class UpdatedUserResponse(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
-
-
-class UserServiceResult(BaseModel):
-    success: bool
-    status_code: int
-    detail: str = None
-    data: Any = None
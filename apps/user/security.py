@@ -4,6 +4,8 @@ from typing import Any, Optional
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from passlib.context import CryptContext
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
 
 from apps.user.models import User
 from config import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
@@ -48,3 +50,12 @@ async def check_user_permissions(target_user: User, current_user: User) -> bool:
         elif (current_user.is_admin and not current_user.is_superuser) and target_user.is_superuser:
             return False
     return True
+
+
+def permission_clause(current_user: User) -> ColumnElement[bool]:
+    """check_user_permissions as a SQL predicate over the target `User` row."""
+    if current_user.is_superuser:
+        return and_(User.id != current_user.id, User.is_superuser.is_(False))
+    if current_user.is_admin:
+        return or_(User.id == current_user.id, and_(User.is_admin.is_(False), User.is_superuser.is_(False)))
+    return User.id == current_user.id
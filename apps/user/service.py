@@ -1,123 +1,190 @@
 from datetime import timedelta
+from typing import Any, AsyncIterator, Mapping, Sequence
 
 from fastapi import status
 from jose import JWTError, jwt
+from sqlalchemy import Row
 
+from apps.results import ServiceResult
 from apps.user import security
+from apps.user.hashing import PasswordHasherBusyError, password_hasher
 from apps.user.models import User
-from apps.user.schemas import UpdateUserRequest, UserCreate
-from config import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
-from tasks.tasks import send_email_for_verification
+from apps.user.schemas import (ShowUser, UpdateUserRequest, UserCreate,
+                               UserListFilter)
+from caching.namespaces import USERS_NAMESPACE, invalidate
+from caching.tiered import TieredCache
+from config import (ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, EXPORT_BATCH_SIZE,
+                    SECRET_KEY)
+from db.pagination import InvalidCursorError, KeysetPage
 
-from .repository.base import UserRepository
-from .schemas import UserServiceResult
+from .repository.base import UserAlreadyExistsError, UserRepository
+
+PASSWORD_HASHER_BUSY_DETAIL = "Too many password checks in progress, try again later."
 
 
 class UserService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, principal_cache: TieredCache[ShowUser]):
         self._user_repository = user_repository
+        self._principal_cache = principal_cache
 
-    async def create(self, user: UserCreate) -> UserServiceResult:
-        if await self._user_repository.check_duplicate_email(email=user.email):
-            return UserServiceResult(
+    async def create(self, user: UserCreate) -> ServiceResult[User]:
+        try:
+            new_user = await self._user_repository.create(user=user)
+        except UserAlreadyExistsError as exc:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_409_CONFLICT,
-                detail="This email is already registered",
+                detail=f"This {exc.field} is already registered",
             )
-        if await self._user_repository.check_duplicate_username(username=user.username):
-            return UserServiceResult(
-                success=False, status_code=status.HTTP_409_CONFLICT,
-                detail="This username is already registered",
+        except PasswordHasherBusyError:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=PASSWORD_HASHER_BUSY_DETAIL,
             )
+        await invalidate(USERS_NAMESPACE)
 
-        new_user = await self._user_repository.create(user=user)
-        send_email_for_verification.delay(user.username, user.email)
-
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=new_user)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=new_user)
 
-    async def get_user(self, user_id: int) -> UserServiceResult:
+    async def get_user(self, user_id: int) -> ServiceResult[User]:
         user = await self._get_user_or_404(user_id=user_id)
-        if isinstance(user, UserServiceResult):
+        if isinstance(user, ServiceResult):
             return user
 
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=user)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=user)
 
-    async def get_by_username(self, username: str) -> UserServiceResult:
+    async def get_by_username(self, username: str) -> ServiceResult[User]:
         user = await self._user_repository.get_by_username(username=username)
         if not user:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found.",
             )
 
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=user)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=user)
 
-    async def get_all(self) -> UserServiceResult:
-        users = await self._user_repository.get_all()
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=users)
+    async def get_principal(self, username: str) -> ShowUser | None:
+        return await self._principal_cache.get_or_load(username, lambda: self._load_principal(username=username))
 
-    async def update(self, user_id: int, data_to_update: UpdateUserRequest, current_user: User) -> UserServiceResult:
-        user_for_update = await self._user_repository.get_user(user_id=user_id)
+    async def get_all(self) -> ServiceResult[Sequence[User]]:
+        users = await self._user_repository.get_all()
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=users)
 
-        if not user_for_update:
-            return UserServiceResult(
-                success=False, status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {user_id} not found."
+    async def get_page(
+            self, filters: UserListFilter, size: int, cursor: str | None = None,
+    ) -> ServiceResult[KeysetPage]:
+        try:
+            page = await self._user_repository.get_page(filters=filters, size=size, cursor=cursor)
+        except InvalidCursorError:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.",
             )
 
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=page)
+
+    async def export(self, batch_size: int = EXPORT_BATCH_SIZE) -> ServiceResult[AsyncIterator[Sequence[Row]]]:
+        return ServiceResult(
+            success=True, status_code=status.HTTP_200_OK, data=self._user_repository.export(batch_size=batch_size),
+        )
+
+    async def search(self, prefix: str, limit: int) -> ServiceResult[Sequence[Mapping[str, Any]]]:
+        users = await self._user_repository.search(prefix=prefix, limit=limit)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=users)
+
+    async def update(self, user_id: int, data_to_update: UpdateUserRequest, current_user: User) -> ServiceResult[User]:
         updated_user_params = data_to_update.model_dump(exclude_none=True)
 
         if not updated_user_params:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="At least one parameter for user update info should be provided",
             )
 
-        if email := updated_user_params.get('email'):
-            if await self._user_repository.check_duplicate_email(email=email):
-                return UserServiceResult(
-                    success=False, status_code=status.HTTP_409_CONFLICT,
-                    detail="This email is already registered",
-                )
-
-        if username := updated_user_params.get('username'):
-            if await self._user_repository.check_duplicate_username(username=username):
-                return UserServiceResult(
-                    success=False, status_code=status.HTTP_409_CONFLICT,
-                    detail="This username is already registered",
+        if updated_user_params.get('password'):
+            # Hashing is the expensive part of an update, so requests that cannot succeed never queue it.
+            permission = await self._user_repository.update_permission(user_id=user_id, current_user=current_user)
+            if permission.username is None:
+                return ServiceResult(
+                    success=False, status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {user_id} not found."
                 )
-
-        if user_id != current_user.id:
-            if not await security.check_user_permissions(target_user=user_for_update, current_user=current_user):
-                return UserServiceResult(
+            if not permission.allowed:
+                return ServiceResult(
                     success=False, status_code=status.HTTP_403_FORBIDDEN,
                     detail="Forbidden.",
                 )
+            try:
+                updated_user_params['hashed_password'] = await password_hasher.hash(updated_user_params.pop('password'))
+            except PasswordHasherBusyError:
+                return ServiceResult(
+                    success=False, status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=PASSWORD_HASHER_BUSY_DETAIL,
+                )
 
-        if updated_user_params.get('password'):
-            updated_user_params['hashed_password'] = security.get_hash_password(updated_user_params.pop('password'))
+        try:
+            outcome = await self._user_repository.update_if_permitted(
+                user_id=user_id, current_user=current_user, updated_user_params=updated_user_params,
+            )
+        except UserAlreadyExistsError as exc:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_409_CONFLICT,
+                detail=f"This {exc.field} is already registered",
+            )
 
-        updated_user = await self._user_repository.update(user_id=user_id, updated_user_params=updated_user_params)
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=updated_user)
+        if outcome.old_username is None:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {user_id} not found."
+            )
 
-    async def delete(self, user_id: int, current_user: User) -> UserServiceResult:
-        user_for_del = await self._get_user_or_404(user_id=user_id)
-        if isinstance(user_for_del, UserServiceResult):
-            return user_for_del
+        if outcome.email_taken or outcome.username_taken:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_409_CONFLICT,
+                detail=f"This {'email' if outcome.email_taken else 'username'} is already registered",
+            )
 
-        if not security.check_user_permissions(target_user=user_for_del, current_user=current_user):
-            return UserServiceResult(
+        if not outcome.allowed:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden.",
             )
 
-        await self._user_repository.delete(user_id=user_id)
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK)
+        if outcome.updated_user is None:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND, detail=f"User with id {user_id} not found."
+            )
+
+        updated_user = outcome.updated_user
+        await self._principal_cache.invalidate(outcome.old_username, updated_user.username)
+        await invalidate(USERS_NAMESPACE)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=updated_user)
 
-    async def login_for_access_token(self, username: str, password: str) -> UserServiceResult:
+    async def delete(self, user_id: int, current_user: User) -> ServiceResult[None]:
+        outcome = await self._user_repository.delete_if_permitted(user_id=user_id, current_user=current_user)
+        if outcome.username is None:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found.",
+            )
+
+        if not outcome.allowed:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_403_FORBIDDEN,
+                detail="Forbidden.",
+            )
+
+        if outcome.deleted:
+            await self._principal_cache.invalidate(outcome.username)
+            await invalidate(USERS_NAMESPACE)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK)
+
+    async def login_for_access_token(self, username: str, password: str) -> ServiceResult[dict[str, str]]:
         user = await self._user_repository.get_by_username(username=username)
-        verify_pass = security.verify_password(password, user.hashed_password)
 
-        if not user or not verify_pass:
-            return UserServiceResult(
+        try:
+            verified = user is not None and await password_hasher.verify(password, user.hashed_password)
+        except PasswordHasherBusyError:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=PASSWORD_HASHER_BUSY_DETAIL,
+            )
+
+        if not verified:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
             )
@@ -129,92 +196,109 @@ class UserService:
         )
         token_data = {"access_token": access_token, "token_type": "bearer"}
 
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=token_data)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=token_data)
 
-    async def email_verification(self, token: str):
+    async def email_verification(self, token: str) -> ServiceResult[None]:
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            username = payload.get("sub")
-            user = await self._user_repository.get_by_username(username=username)
         except JWTError:
-            return UserServiceResult(
+            payload = {}
+        username = payload.get("sub")
+        if not username:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token",
             )
 
-        if not user:
-            return UserServiceResult(
-                success=False, status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
+        outcome = await self._user_repository.verify_email(username=username)
+        if not outcome.found:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found.",
+            )
+        if outcome.updated_user is None:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_409_CONFLICT,
+                detail="Email is already verified.",
             )
-        user_params = {"is_verified_email": True}
 
-        await self._user_repository.update(user_id=user.id, updated_user_params=user_params)
+        await self._principal_cache.invalidate(username)
+        await invalidate(USERS_NAMESPACE)
+
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK)
 
-    async def add_admin_privilege(self, user_id: int, current_user: User):
+    async def add_admin_privilege(self, user_id: int, current_user: User) -> ServiceResult[Row]:
         if not current_user.is_superuser:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden.",
             )
         if current_user.id == user_id:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot manage privileges of itself.",
             )
 
-        user_for_promotion = await self._get_user_or_404(user_id=user_id)
-        if isinstance(user_for_promotion, UserServiceResult):
-            return user_for_promotion
-
-        if user_for_promotion.is_admin or user_for_promotion.is_superuser:
-            return UserServiceResult(
+        outcome = await self._user_repository.set_admin(user_id=user_id, is_admin=True)
+        if not outcome.found:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found.",
+            )
+        if outcome.updated_user is None:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_409_CONFLICT,
                 detail=f"User with id {user_id} already promoted to admin / superadmin.",
             )
 
-        updated_user_params = {"is_admin": True}
-        user = await self._user_repository.update(user_id=user_id, updated_user_params=updated_user_params)
+        await self._principal_cache.invalidate(outcome.updated_user.username)
+        await invalidate(USERS_NAMESPACE)
 
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=user)
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=outcome.updated_user)
 
-    async def remove_admin_privilege(self, user_id: int, current_user: User):
+    async def remove_admin_privilege(self, user_id: int, current_user: User) -> ServiceResult[Row]:
         if not current_user.is_superuser:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_403_FORBIDDEN,
                 detail="Forbidden.",
             )
         if current_user.id == user_id:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot manage privileges of itself.",
             )
 
-        user_for_downgrade = await self._get_user_or_404(user_id=user_id)
-        if isinstance(user_for_downgrade, UserServiceResult):
-            return user_for_downgrade
-
-        if user_for_downgrade.is_superuser:
-            return UserServiceResult(
+        outcome = await self._user_repository.set_admin(user_id=user_id, is_admin=False)
+        if not outcome.found:
+            return ServiceResult(
+                success=False, status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found.",
+            )
+        if outcome.was_superuser:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_409_CONFLICT,
                 detail="Superuser privileges cannot be changed",
             )
-
-        if not user_for_downgrade.is_admin:
-            return UserServiceResult(
+        if outcome.updated_user is None:
+            return ServiceResult(
                 success=False, status_code=status.HTTP_409_CONFLICT,
                 detail=f"User with id {user_id} has no admin privileges.",
             )
 
-        updated_user_params = {"is_admin": False}
-        user = await self._user_repository.update(user_id=user_id, updated_user_params=updated_user_params)
+        await self._principal_cache.invalidate(outcome.updated_user.username)
+        await invalidate(USERS_NAMESPACE)
+
+        return ServiceResult(success=True, status_code=status.HTTP_200_OK, data=outcome.updated_user)
 
-        return UserServiceResult(success=True, status_code=status.HTTP_200_OK, data=user)
+    async def _load_principal(self, username: str) -> ShowUser | None:
+        # Read the primary so a revoked privilege is never re-cached from a lagging replica.
+        user = await self._user_repository.get_by_username(username=username, consistent=True)
+        return ShowUser.model_validate(user) if user else None
 
-    async def _get_user_or_404(self, user_id: int) -> User | UserServiceResult:
-        user = await self._user_repository.get_user(user_id=user_id)
+    async def _get_user_or_404(self, user_id: int, consistent: bool = False) -> User | ServiceResult[None]:
+        user = await self._user_repository.get_user(user_id=user_id, consistent=consistent)
         if not user:
-            return UserServiceResult(
+            return ServiceResult(
                 success=False, status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found.",
             )
@@ -0,0 +1,64 @@
+"""Compare a bench.load report with a baseline and flag regressions.
+
+    python -m bench.compare bench/baseline.json bench-results.json [--threshold 0.1]
+
+Both reports come from bench.load, the baseline recorded on the baseline revision
+with `--output bench/baseline.json`.
+
+A scenario regresses when a latency percentile grows, or its throughput drops,
+by more than `--threshold` relative to the baseline, or when its error rate
+grows at all. Exits with status 1 if anything regressed, so it can gate CI.
+"""
+import argparse
+import json
+import sys
+
+# metric -> True when a larger value is better
+METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "throughput_rps": True,
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            print(f"{name:<20} not in baseline, skipped")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            change = (result[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+            regressed = -change > threshold if higher_is_better else change > threshold
+            print(f"{name:<20} {metric:<15} {base[metric]:10.2f} -> {result[metric]:10.2f}   {change:+7.1%}"
+                  + ("   REGRESSION" if regressed else ""))
+            if regressed:
+                regressions.append(f"{name}.{metric} {change:+.1%}")
+        if result["error_rate"] > base["error_rate"]:
+            regressions.append(f"{name}.error_rate {base['error_rate']:.2%} -> {result['error_rate']:.2%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Tolerated relative change, 0.1 is 10%%.")
+    args = parser.parse_args()
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print("\nRegressions:\n" + "\n".join(f"  {regression}" for regression in regressions))
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Drive endpoint scenarios against a running app and record latency percentiles and throughput.
+
+    python -m bench.seed ...                     # once, against the app's database
+    git checkout <baseline revision>             # then restart the app
+    python -m bench.load --base-url http://localhost:8001 --output bench/baseline.json
+    git checkout -                               # then restart the app
+    python -m bench.load --base-url http://localhost:8001 --output bench-results.json
+    python -m bench.compare bench/baseline.json bench-results.json
+
+bench/baseline.json is not committed: numbers only compare when both runs use
+the same machine and seeded database, so record it before each comparison.
+
+Every scenario runs `--requests` requests from `--concurrency` concurrent clients
+after `--warmup` unrecorded ones. Any response other than 2xx counts as an error.
+Scenarios on cached list endpoints also record the share of responses served
+from the cache.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+from caching.namespaces import CACHE_STATUS_HEADER
+
+PERCENTILES = (50, 95, 99)
+
+LIST_PAGE_SIZES = (10, 20, 50)
+
+
+@dataclass
+class Context:
+    manifest: dict
+    rng: random.Random
+    auth_headers: list[dict[str, str]] = field(default_factory=list)
+    # (auth headers of the author, post id) of posts the benchmark may update
+    own_posts: list[tuple[dict[str, str], int]] = field(default_factory=list)
+    # (path, query params) of a listing -> cursor of the page it continues with
+    list_cursors: dict[tuple, str] = field(default_factory=dict)
+
+    def random_post_id(self) -> int:
+        return self.rng.randint(*self.manifest["post_ids"])
+
+    def random_user_id(self) -> int:
+        return self.rng.randint(*self.manifest["user_ids"])
+
+    def random_username(self) -> str:
+        return self.manifest["username_template"].format(id=self.random_user_id())
+
+    def random_user_filter(self) -> dict:
+        username_prefix = self.manifest["username_template"].split("{")[0] + str(self.rng.randint(1, 9))
+        return self.rng.choice([
+            {}, {"is_admin": "false"}, {"is_verified_email": "false"}, {"username_prefix": username_prefix},
+        ])
+
+
+def new_post(rng: random.Random) -> dict:
+    return {
+        "title": f"Benchmark post {rng.getrandbits(48):x}",
+        "text": "benchmark " * rng.randint(50, 500),
+        "short_description": "Created by bench.load",
+    }
+
+
+async def walk_list(client: httpx.AsyncClient, context: Context, path: str, params: dict) -> httpx.Response:
+    """Fetch the next page of a listing, starting over after its last page.
+
+    Each listing is walked from page to page, so list scenarios read every
+    page instead of rereading the first one from the cache.
+    """
+    listing = (path, *sorted(params.items()))
+    cursor = context.list_cursors.pop(listing, None)
+    response = await client.get(path, params={**params, "cursor": cursor} if cursor else params)
+    if response.is_success and (next_page := response.json()["next_page"]):
+        context.list_cursors[listing] = next_page
+    return response
+
+
+async def get_post(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await client.get("/posts/", params={"post_id": context.random_post_id()})
+
+
+async def list_posts(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await walk_list(client, context, "/posts/list", {"size": context.rng.choice(LIST_PAGE_SIZES)})
+
+
+async def list_posts_by_user(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await client.get("/posts/user_id", params={"user_id": context.random_user_id(), "size": 50})
+
+
+async def list_users(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await walk_list(
+        client, context, "/users/list", {**context.random_user_filter(), "size": context.rng.choice(LIST_PAGE_SIZES)},
+    )
+
+
+async def create_post(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    headers = context.rng.choice(context.auth_headers)
+    response = await client.post("/posts/", json=new_post(context.rng), headers=headers)
+    if response.is_success:
+        context.own_posts.append((headers, response.json()["id"]))
+    return response
+
+
+async def login(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await client.post(
+        "/users/token", data={"username": context.random_username(), "password": context.manifest["password"]},
+    )
+
+
+async def update_post(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    headers, post_id = context.rng.choice(context.own_posts)
+    return await client.patch(
+        "/posts/", params={"post_id": post_id},
+        json={"short_description": f"Updated by bench.load {context.rng.getrandbits(32):x}"}, headers=headers,
+    )
+
+
+SCENARIOS: dict[str, Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]] = {
+    "get_post": get_post,
+    "list_posts": list_posts,
+    "list_posts_by_user": list_posts_by_user,
+    "list_users": list_users,
+    "create_post": create_post,
+    "login": login,
+    "update_post": update_post,
+}
+
+
+async def prepare(client: httpx.AsyncClient, context: Context, users: int, posts_per_user: int) -> None:
+    for user_id in range(context.manifest["user_ids"][0], context.manifest["user_ids"][0] + users):
+        response = await client.post("/users/token", data={
+            "username": context.manifest["username_template"].format(id=user_id),
+            "password": context.manifest["password"],
+        })
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        context.auth_headers.append(headers)
+        for _ in range(posts_per_user):
+            response = await client.post("/posts/", json=new_post(context.rng), headers=headers)
+            response.raise_for_status()
+            context.own_posts.append((headers, response.json()["id"]))
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    # Nearest-rank percentile, exact for the recorded samples.
+    index = max(0, min(len(sorted_values) - 1, round(rank / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+        client: httpx.AsyncClient, context: Context, scenario: Callable, requests: int, concurrency: int, warmup: int,
+) -> dict:
+    for _ in range(warmup):
+        await scenario(client, context)
+
+    latencies: list[float] = []
+    errors = 0
+    cache_statuses = {"HIT": 0, "MISS": 0}
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            try:
+                response = await scenario(client, context)
+                failed = not response.is_success
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started_at)
+            errors += failed
+            if not failed and (cache_status := response.headers.get(CACHE_STATUS_HEADER)) in cache_statuses:
+                cache_statuses[cache_status] += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    cached_responses = sum(cache_statuses.values())
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": errors / requests,
+        "throughput_rps": requests / elapsed,
+        "mean_ms": sum(latencies) / len(latencies) * 1e3,
+        **{f"p{rank}_ms": percentile(latencies, rank) * 1e3 for rank in PERCENTILES},
+        "max_ms": latencies[-1] * 1e3,
+        # None for scenarios on endpoints without a response cache
+        "cache_hit_ratio": cache_statuses["HIT"] / cached_responses if cached_responses else None,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with open(args.manifest) as file:
+        context = Context(manifest=json.load(file), rng=random.Random(args.seed))
+    started_at = datetime.now(timezone.utc)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        await prepare(client, context, users=args.users, posts_per_user=args.posts_per_user)
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(
+                client, context, SCENARIOS[name], requests=args.requests, concurrency=args.concurrency,
+                warmup=args.warmup,
+            )
+            print(f"{name:<20} {results[name]['throughput_rps']:8.1f} req/s   "
+                  + "   ".join(f"p{rank} {results[name][f'p{rank}_ms']:7.1f} ms" for rank in PERCENTILES)
+                  + f"   errors {results[name]['errors']}"
+                  + (f"   cache hits {results[name]['cache_hit_ratio']:.1%}"
+                     if results[name]["cache_hit_ratio"] is not None else ""))
+
+    return {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--manifest", default="bench-seed.json")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20, help="Seeded users logged in for write scenarios.")
+    parser.add_argument("--posts-per-user", type=int, default=5, help="Posts created up front for update_post.")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Load synthetic users and posts into the database with COPY.
+
+    python -m bench.seed --users 10000 --posts 200000 [--manifest bench-seed.json]
+
+Sizes follow skewed distributions rather than fixed lengths: post bodies are
+log-normal around ~2 KB with a long tail, and authors are Zipf distributed, so
+a few users own most posts. Ids continue after the existing rows. The manifest
+written at the end tells `bench.load` which ids and credentials to use.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Sequence
+
+import asyncpg
+from slugify import slugify
+
+from apps.user.security import get_hash_password
+from config import REAL_DATABASE_URL
+
+USER_COLUMNS = (
+    "id", "username", "email", "is_active", "hashed_password", "is_admin", "is_superuser", "is_verified_email",
+)
+POST_COLUMNS = ("id", "author_id", "slug", "title", "text", "short_description", "published_at")
+
+WORDS = (
+    "async database index query latency cache replica cursor page request response worker pool thread "
+    "connection transaction snapshot commit rollback vector search token session router schema model "
+    "benchmark throughput percentile python postgres redis celery email user post title slug author"
+).split()
+CORPUS_SIZE = 1 << 20
+TEXT_MEDIAN_CHARS = 2000
+TEXT_SIGMA = 1.0
+TEXT_BOUNDS = (80, 100_000)
+AUTHOR_ZIPF_EXPONENT = 1.1
+PUBLISHED_WITHIN_DAYS = 730
+USERNAME_TEMPLATE = "bench_user_{id}"
+
+
+def username(user_id: int) -> str:
+    return USERNAME_TEMPLATE.format(id=user_id)
+
+
+def make_corpus(rng: random.Random) -> str:
+    words = []
+    size = 0
+    while size < CORPUS_SIZE:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def excerpt(rng: random.Random, corpus: str, length: int) -> str:
+    start = rng.randrange(len(corpus) - length)
+    return corpus[start:start + length]
+
+
+def text_length(rng: random.Random) -> int:
+    length = int(rng.lognormvariate(math.log(TEXT_MEDIAN_CHARS), TEXT_SIGMA))
+    return min(max(length, TEXT_BOUNDS[0]), TEXT_BOUNDS[1])
+
+
+def iter_users(rng: random.Random, first_id: int, count: int, hashed_password: str) -> Iterator[tuple]:
+    for user_id in range(first_id, first_id + count):
+        yield (
+            user_id,
+            username(user_id),
+            f"{username(user_id)}@example.com",
+            True,
+            hashed_password,
+            rng.random() < 0.02,
+            False,
+            rng.random() < 0.7,
+        )
+
+
+def iter_posts(
+        rng: random.Random, corpus: str, first_id: int, count: int, author_ids: Sequence[int],
+) -> Iterator[tuple]:
+    cum_weights = list(itertools.accumulate(1 / rank ** AUTHOR_ZIPF_EXPONENT for rank in range(1, len(author_ids) + 1)))
+    now = datetime.now(timezone.utc)
+    for post_id in range(first_id, first_id + count):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 12))).capitalize()[:100]
+        yield (
+            post_id,
+            rng.choices(author_ids, cum_weights=cum_weights)[0],
+            f"{slugify(title)}-{post_id}",
+            title,
+            excerpt(rng, corpus, text_length(rng)),
+            excerpt(rng, corpus, rng.randint(40, 240)),
+            now - timedelta(seconds=rng.uniform(0, PUBLISHED_WITHIN_DAYS * 86400)),
+        )
+
+
+async def copy_in_batches(
+        connection: asyncpg.Connection, table: str, columns: Sequence[str], records: Iterator[tuple], batch_size: int,
+) -> None:
+    while batch := list(itertools.islice(records, batch_size)):
+        await connection.copy_records_to_table(table, records=batch, columns=columns)
+        print(f"{table}: copied up to id {batch[-1][0]}")
+
+
+async def next_id(connection: asyncpg.Connection, table: str) -> int:
+    return await connection.fetchval(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+
+
+async def seed(
+        database_url: str, users: int, posts: int, password: str, batch_size: int, seed_value: int,
+) -> dict:
+    rng = random.Random(seed_value)
+    connection = await asyncpg.connect(database_url)
+    try:
+        first_user_id = await next_id(connection, "users")
+        first_post_id = await next_id(connection, "posts")
+        await copy_in_batches(
+            connection, "users", USER_COLUMNS,
+            iter_users(rng, first_user_id, users, get_hash_password(password)), batch_size,
+        )
+        author_ids = list(range(first_user_id, first_user_id + users))
+        rng.shuffle(author_ids)
+        await copy_in_batches(
+            connection, "posts", POST_COLUMNS,
+            iter_posts(rng, make_corpus(rng), first_post_id, posts, author_ids), batch_size,
+        )
+        # Rows were copied with explicit ids, move the sequences past them.
+        for table in ("users", "posts"):
+            await connection.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            )
+        await connection.execute("ANALYZE users, posts")
+    finally:
+        await connection.close()
+    return {
+        "user_ids": [first_user_id, first_user_id + users - 1],
+        "post_ids": [first_post_id, first_post_id + posts - 1],
+        "username_template": USERNAME_TEMPLATE,
+        "password": password,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=200_000)
+    parser.add_argument("--password", default="BenchPass1!")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0, help="Random seed, the same seed generates the same data.")
+    parser.add_argument("--database-url", default="".join(REAL_DATABASE_URL.split("+asyncpg")))
+    parser.add_argument("--manifest", default="bench-seed.json")
+    args = parser.parse_args()
+
+    manifest = asyncio.run(seed(args.database_url, args.users, args.posts, args.password, args.batch_size, args.seed))
+    with open(args.manifest, "w") as file:
+        json.dump(manifest, file, indent=2)
+    print(f"Seed manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
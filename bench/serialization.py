@@ -0,0 +1,93 @@
+"""Compare FastAPI's response_model serialization with the pre-serialized fast path.
+
+    python -m bench.serialization [--posts 100] [--text-size 10000] [--repeat 200]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from fastapi_pagination.cursor import CursorPage
+from pydantic import TypeAdapter
+
+from apps.post.schemas import PostSummary, ShowPost
+from apps.responses import PreserializedResponse
+
+
+def make_posts(count: int, text_size: int) -> list[SimpleNamespace]:
+    # Attribute objects stand in for ORM rows, validated with from_attributes like in the app.
+    return [
+        SimpleNamespace(
+            id=post_id,
+            author_id=post_id % 17,
+            slug=f"post-{post_id}",
+            title=f"Post number {post_id}",
+            text="lorem ipsum " * (text_size // 12),
+            short_description="short description " * 10,
+            published_at=datetime(2023, 5, 15, tzinfo=timezone.utc),
+        )
+        for post_id in range(count)
+    ]
+
+
+def fastapi_path(response_model: Any) -> Callable[[Any], bytes]:
+    field = create_response_field(name="Response_bench", type_=response_model, mode="serialization")
+
+    def render(content: Any) -> bytes:
+        return JSONResponse(_run(serialize_response(field=field, response_content=content))).body
+
+    return render
+
+
+def fast_path(response_model: Any) -> Callable[[Any], bytes]:
+    adapter = TypeAdapter(response_model)
+
+    def render(content: Any) -> bytes:
+        value = adapter.validate_python(content, from_attributes=True)
+        return PreserializedResponse(adapter.dump_json(value, by_alias=True)).body
+
+    return render
+
+
+_loop = asyncio.new_event_loop()
+
+
+def _run(coroutine: Any) -> Any:
+    return _loop.run_until_complete(coroutine)
+
+
+def measure(render: Callable[[Any], bytes], content: Any, repeat: int) -> float:
+    render(content)
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        render(content)
+    return (time.perf_counter() - started_at) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--text-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts, args.text_size)
+    cases = {
+        "CursorPage[PostSummary]": (CursorPage[PostSummary], {"items": posts, "next_page": "cursor"}),
+        "list[ShowPost]": (list[ShowPost], posts),
+    }
+    for name, (response_model, content) in cases.items():
+        assert fastapi_path(response_model)(content) == fast_path(response_model)(content)
+        baseline = measure(fastapi_path(response_model), content, args.repeat)
+        fast = measure(fast_path(response_model), content, args.repeat)
+        print(f"{name:<24} response_model {baseline * 1e3:8.3f} ms   fast path {fast * 1e3:8.3f} ms   "
+              f"x{baseline / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Cost of building a service result: the former pydantic wrapper against the slotted dataclass.
+
+    python -m bench.service_result [--repeat 200000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from pydantic import BaseModel, ConfigDict
+
+from apps.results import ServiceResult
+
+
+class PydanticServiceResult(BaseModel):
+    # Shape of the PostServiceResult / UserServiceResult models this replaced.
+    success: bool
+    status_code: int
+    detail: str = None
+    data: Any = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+def measure_cpu(build: Callable[[], Any], repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    return (time.perf_counter() - started_at) / repeat
+
+
+def measure_allocated(build: Callable[[], Any], count: int = 1000) -> float:
+    # Keep the results alive, so the traced peak is what `count` of them hold.
+    tracemalloc.start()
+    results = [build() for _ in range(count)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return allocated / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200_000)
+    args = parser.parse_args()
+
+    post = SimpleNamespace(id=1, title="title", text="text")
+    cases = {
+        "pydantic model": lambda: PydanticServiceResult(success=True, status_code=200, data=post),
+        "slotted dataclass": lambda: ServiceResult(success=True, status_code=200, data=post),
+    }
+    for name, build in cases.items():
+        sample = build()
+        print(f"{name:<18} {measure_cpu(build, args.repeat) * 1e9:8.0f} ns/result   "
+              f"{measure_allocated(build):6.0f} B allocated/result   {sys.getsizeof(sample):4d} B object")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Throughput of verification email delivery: a connection per message against the SMTP pool.
+
+Runs against a local aiosmtpd sink, aiosmtpd is a dev dependency:
+
+    python -m bench.smtp [--messages 500] [--concurrency 4] [--handshake-ms 50]
+
+`--handshake-ms` delays the EHLO reply to stand in for the TLS handshake and AUTH
+a real provider costs on every new connection.
+"""
+import argparse
+import asyncio
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from aiosmtpd.controller import Controller
+
+from tasks.smtp import SMTPConnectionPool
+from tasks.tasks import setup_email_for_verification
+
+HOST = "127.0.0.1"
+
+
+class SinkHandler:
+    def __init__(self, handshake_seconds: float):
+        self.handshake_seconds = handshake_seconds
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_seconds)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+def connection_per_message(port: int) -> Callable[[object], None]:
+    def send(message) -> None:
+        with smtplib.SMTP(HOST, port) as server:
+            server.send_message(message)
+
+    return send
+
+
+def run(send: Callable[[object], None], messages: list, concurrency: int) -> float:
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, messages))
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-messages-per-connection", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=50)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname=HOST, port=args.port)
+    controller.start()
+    try:
+        messages = [
+            setup_email_for_verification(f"user{number}", f"user{number}@example.com")
+            for number in range(args.messages)
+        ]
+        pool = SMTPConnectionPool(
+            host=HOST, port=args.port, user=None, password=None, size=args.concurrency,
+            max_messages=args.max_messages_per_connection, health_check_seconds=30, timeout=30, use_ssl=False,
+        )
+        cases = {
+            "connection per message": connection_per_message(args.port),
+            "connection pool": pool.send_message,
+        }
+        for name, send in cases.items():
+            elapsed = run(send, messages, args.concurrency)
+            print(f"{name:<24} {args.messages / elapsed:8.1f} messages/s   {elapsed:6.2f} s")
+        pool.close()
+        assert handler.received == args.messages * len(cases)
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from starlette.requests import Request
+from starlette.responses import Response
+
+POSTS_NAMESPACE = "posts"
+USERS_NAMESPACE = "users"
+
+# Entries live for hours server side but are retired early by `invalidate`, so HTTP caches must revalidate them.
+LIST_CACHE_CONTROL = "no-cache"
+
+# Tells clients such as bench.load whether the cached endpoint ran, since Cache-Control no longer does.
+CACHE_STATUS_HEADER = "X-Cache"
+
+_endpoint_ran: ContextVar[bool] = ContextVar("endpoint_ran", default=False)
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(namespace: str) -> str:
+    return f"{FastAPICache.get_prefix()}:{namespace}:version"
+
+
+async def get_namespace_version(namespace: str) -> int:
+    try:
+        version = await FastAPICache.get_backend().redis.get(_version_key(namespace))
+    except Exception:
+        logger.warning(f"Error retrieving version of cache namespace '{namespace}':", exc_info=True)
+        return 0
+    return int(version or 0)
+
+
+async def namespace_key_builder(
+        func: Callable,
+        namespace: Optional[str] = "",
+        request: Optional[Request] = None,
+        response: Optional[Response] = None,
+        args: Optional[tuple] = None,
+        kwargs: Optional[dict] = None,
+) -> str:
+    version = await get_namespace_version(namespace)
+    query = urlencode(sorted(request.query_params.multi_items())) if request else ""
+    path = request.url.path if request else f"{func.__module__}:{func.__name__}"
+    return f"{FastAPICache.get_prefix()}:{namespace}:v{version}:{path}?{query}"
+
+
+async def invalidate(*namespaces: str) -> None:
+    """Retire every cached entry of `namespaces` by bumping their versions.
+
+    Old entries are never read again and fall out of Redis with their TTL.
+    """
+    try:
+        async with FastAPICache.get_backend().redis.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                pipe.incr(_version_key(namespace))
+            await pipe.execute()
+    except Exception:
+        logger.warning(f"Error invalidating cache namespaces {namespaces}:", exc_info=True)
+
+
+def _etag(value: Any) -> str:
+    return f'W/"{hashlib.sha1(FastAPICache.get_coder().encode(value).encode()).hexdigest()}"'
+
+
+def cache_list(namespace: str, expire: Optional[int] = None) -> Callable[[Callable], Callable]:
+    """fastapi-cache `cache` for list endpoints whose responses clients revalidate on every use.
+
+    fastapi-cache advertises the server-side TTL as `max-age`, which would let
+    browsers and proxies keep serving a page long after a write invalidated it.
+    fastapi-cache's own ETag is built from the per-process `hash()`, so it is
+    replaced by a digest of the encoded body that every worker agrees on, and
+    revalidating an unchanged page answers 304 whichever worker it reaches.
+    `X-Cache` says whether the page was served from the cache.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def load(*args: Any, **kwargs: Any) -> Any:
+            _endpoint_ran.set(True)
+            return await func(*args, **kwargs)
+
+        cached = cache(expire=expire, namespace=namespace)(load)
+
+        @wraps(cached)
+        async def endpoint(*args: Any, **kwargs: Any) -> Any:
+            token = _endpoint_ran.set(False)
+            try:
+                ret = await cached(*args, **kwargs)
+                ran = _endpoint_ran.get()
+            finally:
+                _endpoint_ran.reset(token)
+            request: Request = kwargs["request"]
+            response: Response = kwargs["response"]
+            response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+            response.headers[CACHE_STATUS_HEADER] = "MISS" if ran else "HIT"
+            if ret is response:
+                return ret
+            etag = _etag(ret)
+            response.headers["ETag"] = etag
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers=dict(response.headers))
+            if isinstance(ret, Response):
+                # FastAPI ignores the injected response's headers when the endpoint returns its own response.
+                ret.headers.update(response.headers)
+            return ret
+
+        return endpoint
+
+    return decorator
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, Type, TypeVar
+
+from prometheus_client import Counter, Gauge
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+
+from .lru import LRUCache
+
+T = TypeVar("T", bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = Counter(
+    "tiered_cache_lookups_total", "Tiered cache lookups by outcome.", ["cache", "result"],
+)
+CACHE_LOCAL_ENTRIES = Gauge(
+    "tiered_cache_local_entries", "Entries held by the in-process tier.", ["cache"],
+)
+CACHE_LOCAL_BYTES = Gauge(
+    "tiered_cache_local_bytes", "Payload bytes held by the in-process tier.", ["cache"],
+)
+
+# Stores a loaded value only if the key's version is still the one read before loading.
+FILL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class TieredCache(Generic[T]):
+    """Read-through cache of pydantic models: in-process LRU, then Redis, then the loader.
+
+    Invalidations delete the Redis entry and are broadcast over Redis pub/sub so
+    every worker drops its local copy. The local tier is only consulted while
+    this worker is subscribed, otherwise it could miss invalidations.
+
+    Every invalidation also bumps a per-key version in Redis. A miss remembers
+    the version it saw and only writes the loaded value back if it is unchanged,
+    so a load racing an invalidation cannot re-cache the value it replaced.
+    """
+
+    def __init__(
+            self, name: str, model: Type[T], ttl: int, local_ttl: float, max_entries: int, max_bytes: int,
+    ):
+        self.name = name
+        self._model = model
+        self._ttl = ttl
+        self._local = LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=local_ttl)
+        self._channel = f"tiered-cache:{name}:invalidate"
+        self._redis: Redis | None = None
+        self._fill: AsyncScript | None = None
+        self._listener: asyncio.Task | None = None
+        self._subscribed = False
+        self._generation = 0
+        CACHE_LOCAL_ENTRIES.labels(cache=name).set_function(lambda: len(self._local))
+        CACHE_LOCAL_BYTES.labels(cache=name).set_function(lambda: self._local.size_bytes)
+
+    def _redis_key(self, key: str) -> str:
+        return f"tiered-cache:{self.name}:{key}"
+
+    def _version_key(self, key: str) -> str:
+        return f"tiered-cache-version:{self.name}:{key}"
+
+    async def start(self, redis: Redis) -> None:
+        self._redis = redis
+        self._fill = redis.register_script(FILL_SCRIPT)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+        self._subscribed = False
+        self._local.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    self._local.clear()
+                    self._subscribed = True
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._generation += 1
+                            self._local.pop(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(f"Lost invalidation channel of cache '{self.name}':", exc_info=True)
+            self._subscribed = False
+            self._local.clear()
+            await asyncio.sleep(1)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[T | None]]) -> T | None:
+        key = str(key)
+        if self._subscribed:
+            value = self._local.get(key)
+            if value is not None:
+                CACHE_LOOKUPS.labels(cache=self.name, result="local_hit").inc()
+                return value
+
+        generation = self._generation
+        payload = version = None
+        if self._redis is not None:
+            try:
+                payload, version = await self._redis.mget(self._redis_key(key), self._version_key(key))
+            except Exception:
+                logger.warning(f"Error retrieving key '{key}' of cache '{self.name}':", exc_info=True)
+
+        if payload is not None:
+            CACHE_LOOKUPS.labels(cache=self.name, result="redis_hit").inc()
+            value = self._model.model_validate_json(payload)
+        else:
+            CACHE_LOOKUPS.labels(cache=self.name, result="miss").inc()
+            value = await loader()
+            if value is None:
+                return None
+            payload = value.model_dump_json()
+            if self._redis is not None:
+                try:
+                    filled = await self._fill(
+                        keys=[self._redis_key(key), self._version_key(key)], args=[version or "", payload, self._ttl],
+                    )
+                except Exception:
+                    logger.warning(f"Error setting key '{key}' of cache '{self.name}':", exc_info=True)
+                else:
+                    if not filled:
+                        # Invalidated while loading: serve what was read, but keep it out of both tiers.
+                        return value
+
+        if self._subscribed and generation == self._generation:
+            self._local.set(key, value, size=len(payload))
+        return value
+
+    async def invalidate(self, *keys: str) -> None:
+        keys = [str(key) for key in keys]
+        self._generation += 1
+        for key in keys:
+            self._local.pop(key)
+        if self._redis is None:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    # Versions only have to outlive the loads already running, an entry's TTL is plenty.
+                    pipe.incr(self._version_key(key))
+                    pipe.expire(self._version_key(key), self._ttl)
+                pipe.delete(*(self._redis_key(key) for key in keys))
+                for key in keys:
+                    pipe.publish(self._channel, key)
+                await pipe.execute()
+        except Exception:
+            logger.warning(f"Error invalidating keys {keys} of cache '{self.name}':", exc_info=True)
@@ -25,6 +25,35 @@ REAL_DATABASE_URL_ALEMBIC = f'postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:' \
 TEST_DATABASE_URL = f'postgresql+asyncpg://{DB_USER_TEST}:{DB_PASS_TEST}@' \
                     f'{DB_HOST_TEST}:{DB_PORT_TEST}/{DB_NAME_TEST}'
 
+PGBOUNCER_HOST_TEST = os.environ.get('PGBOUNCER_HOST_TEST')
+PGBOUNCER_PORT_TEST = os.environ.get('PGBOUNCER_PORT_TEST')
+
+PGBOUNCER_TEST_DATABASE_URL = f'postgresql+asyncpg://{DB_USER_TEST}:{DB_PASS_TEST}@' \
+                              f'{PGBOUNCER_HOST_TEST}:{PGBOUNCER_PORT_TEST}/{DB_NAME_TEST}' \
+    if PGBOUNCER_HOST_TEST else None
+
+DB_REPLICA_HOST = os.environ.get('DB_REPLICA_HOST')
+DB_REPLICA_PORT = os.environ.get('DB_REPLICA_PORT', DB_PORT)
+
+REPLICA_DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_REPLICA_HOST}:' \
+                       f'{DB_REPLICA_PORT}/{DB_NAME}' if DB_REPLICA_HOST else None
+
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+DB_ECHO = os.environ.get('DB_ECHO', 'false').lower() == 'true'
+DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 100))
+DB_RESERVED_CONNECTIONS = int(os.environ.get('DB_RESERVED_CONNECTIONS', 10))
+DB_POOL_SIZE = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+DB_MAX_OVERFLOW = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+DB_POOL_TIMEOUT_SECONDS = float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 30))
+DB_POOL_RECYCLE_SECONDS = int(os.environ.get('DB_POOL_RECYCLE_SECONDS', 30 * 60))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 100))
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'false').lower() == 'true'
+
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 4))
+APP_INSTANCES = int(os.environ.get('APP_INSTANCES', 1))
+
 APP_PORT = int(os.environ.get('APP_PORT'))
 
 SECRET_KEY = os.environ.get('SECRET_KEY')
@@ -32,10 +61,41 @@ ALGORITHM = os.environ.get('ALGORITHM')
 ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES'))
 
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
 REDIS_HOST = os.environ.get('REDIS_HOST')
 REDIS_PORT = int(os.environ.get('REDIS_PORT'))
 
+CACHE_EXPIRE_SECONDS = int(os.environ.get('CACHE_EXPIRE_SECONDS', 6 * 60 * 60))
+FAST_JSON_RESPONSES = os.environ.get('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+
+POST_CACHE_TTL_SECONDS = int(os.environ.get('POST_CACHE_TTL_SECONDS', 5 * 60))
+POST_CACHE_LOCAL_TTL_SECONDS = int(os.environ.get('POST_CACHE_LOCAL_TTL_SECONDS', 60))
+POST_CACHE_MAX_ENTRIES = int(os.environ.get('POST_CACHE_MAX_ENTRIES', 10_000))
+POST_CACHE_MAX_BYTES = int(os.environ.get('POST_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get('PRINCIPAL_CACHE_MAX_ENTRIES', 10_000))
+
+USER_SEARCH_CACHE_SECONDS = int(os.environ.get('USER_SEARCH_CACHE_SECONDS', 30))
+
+BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', 5000))
+BULK_IMPORT_MAX_REPORTED_ERRORS = int(os.environ.get('BULK_IMPORT_MAX_REPORTED_ERRORS', 1000))
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
 SMTP_HOST = os.environ.get('SMTP_HOST')
 SMTP_PORT = int(os.environ.get('SMTP_PORT'))
 SMTP_USER = os.environ.get('SMTP_USER')
 SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_USE_SSL = os.environ.get('SMTP_USE_SSL', 'true').lower() == 'true'
+SMTP_TIMEOUT_SECONDS = float(os.environ.get('SMTP_TIMEOUT_SECONDS', 30))
+SMTP_POOL_SIZE = int(os.environ.get('SMTP_POOL_SIZE', 4))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('SMTP_MAX_MESSAGES_PER_CONNECTION', 100))
+SMTP_HEALTH_CHECK_SECONDS = float(os.environ.get('SMTP_HEALTH_CHECK_SECONDS', 30))
+
+CELERY_WORKER_POOL = os.environ.get('CELERY_WORKER_POOL', 'threads')
+CELERY_WORKER_CONCURRENCY = int(os.environ.get('CELERY_WORKER_CONCURRENCY', SMTP_POOL_SIZE))
+
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_POLL_INTERVAL_SECONDS', 1))
@@ -1,4 +1,5 @@
 from apps.post.models import Post
 from apps.user.models import User
+from tasks.models import OutboxMessage
 
 from .session import Base
@@ -0,0 +1,104 @@
+import time
+from typing import Any
+from uuid import uuid4
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config import (APP_INSTANCES, DB_ECHO, DB_MAX_CONNECTIONS,
+                    DB_MAX_OVERFLOW, DB_PGBOUNCER, DB_POOL_PRE_PING,
+                    DB_POOL_RECYCLE_SECONDS, DB_POOL_SIZE,
+                    DB_POOL_TIMEOUT_SECONDS, DB_RESERVED_CONNECTIONS,
+                    DB_STATEMENT_CACHE_SIZE, WEB_CONCURRENCY)
+
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool.", ["pool"],
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size, negative while the pool is still filling.", ["pool"],
+)
+POOL_SIZE = Gauge(
+    "db_pool_size", "Configured persistent size of the pool.", ["pool"],
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool, waiting and pre-ping included.",
+    ["pool"], buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+def per_worker_pool_size(max_connections: int, reserved_connections: int, workers: int) -> tuple[int, int]:
+    """Split the Postgres connection budget between every worker process.
+
+    Returns `(pool_size, max_overflow)` such that all workers at full overflow
+    stay within `max_connections - reserved_connections`; a quarter of each
+    worker's share is kept as overflow for bursts.
+    """
+    share = max(1, (max_connections - reserved_connections) // max(1, workers))
+    max_overflow = share // 4
+    return share - max_overflow, max_overflow
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    metrics_name = "default"
+
+    def connect(self) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(pool=self.metrics_name).observe(time.perf_counter() - started_at)
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(pgbouncer: bool = DB_PGBOUNCER, **overrides: Any) -> dict[str, Any]:
+    """Keyword arguments for `create_async_engine`.
+
+    Behind a transaction-mode pooler consecutive statements may run on
+    different server connections, so every statement runs inside an explicit
+    transaction (repositories commit their writes) and prepared statements
+    are neither cached nor reused by name. Reads followed by CPU-bound work,
+    such as the user lookup before a password check, commit right away so the
+    server connection is not held idle in transaction meanwhile.
+    """
+    pool_size, max_overflow = per_worker_pool_size(
+        max_connections=DB_MAX_CONNECTIONS,
+        reserved_connections=DB_RESERVED_CONNECTIONS,
+        workers=WEB_CONCURRENCY * APP_INSTANCES,
+    )
+    options = {
+        "echo": DB_ECHO,
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": DB_POOL_SIZE if DB_POOL_SIZE is not None else pool_size,
+        "max_overflow": DB_MAX_OVERFLOW if DB_MAX_OVERFLOW is not None else max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+        "execution_options": {"isolation_level": "AUTOCOMMIT"},
+    }
+    if pgbouncer:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _prepared_statement_name,
+        }
+        options["execution_options"] = {"isolation_level": "READ COMMITTED"}
+    options.update(overrides)
+    return options
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    # Gauges read `engine.pool` lazily since dispose() swaps in a new pool.
+    engine.pool.metrics_name = name
+    POOL_CHECKED_OUT.labels(pool=name).set_function(lambda: engine.pool.checkedout())
+    POOL_OVERFLOW.labels(pool=name).set_function(lambda: engine.pool.overflow())
+    POOL_SIZE.labels(pool=name).set_function(lambda: engine.pool.size())
@@ -0,0 +1,85 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Generic, Sequence, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    items: Sequence[T] = field(default_factory=list)
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+def encode_cursor(values: Sequence[Any], backwards: bool = False) -> str:
+    encoded_values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps([backwards, encoded_values], separators=(",", ":"))
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[ColumnElement]) -> tuple[tuple, bool]:
+    try:
+        backwards, values = json.loads(urlsafe_b64decode(cursor.encode()))
+        if not isinstance(backwards, bool) or len(values) != len(keys):
+            raise InvalidCursorError(cursor)
+        decoded_values = tuple(
+            datetime.fromisoformat(value) if key.type.python_type is datetime else key.type.python_type(value)
+            for key, value in zip(keys, values)
+        )
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError(cursor) from exc
+    return decoded_values, backwards
+
+
+async def paginate_keyset(
+        db_session: AsyncSession, query: Select, keys: Sequence[ColumnElement], size: int, cursor: str | None = None,
+        descending: bool = True, *, scalars: bool,
+) -> KeysetPage:
+    """Page through `query` ordered by `keys` without OFFSET.
+
+    The last key must be unique so the order is total. Cursors carry the key
+    of the boundary row and the direction, so every page is a single index
+    range scan of `size + 1` rows no matter how deep it is. Items are the
+    first column of each row when `scalars` is set, such as the entity of a
+    `select(Post)`, and whole rows otherwise.
+    """
+    backwards = False
+    if cursor:
+        values, backwards = decode_cursor(cursor, keys)
+
+    ascending = backwards if descending else not backwards
+    if cursor:
+        boundary = tuple_(*keys) > tuple_(*values) if ascending else tuple_(*keys) < tuple_(*values)
+        query = query.where(boundary)
+
+    order_by = [key.asc() if ascending else key.desc() for key in keys]
+    result = await db_session.execute(query.order_by(*order_by).limit(size + 1))
+    rows = result.scalars().all() if scalars else result.all()
+
+    has_more = len(rows) > size
+    items = rows[:size]
+    if backwards:
+        items = items[::-1]
+    if not items:
+        return KeysetPage(items=items)
+
+    def key_of(item: Any) -> list[Any]:
+        return [getattr(item, key.key) for key in keys]
+
+    next_cursor = encode_cursor(key_of(items[-1])) if has_more or backwards else None
+    previous_cursor = encode_cursor(key_of(items[0]), backwards=True) if cursor and (has_more or not backwards) \
+        else None
+    return KeysetPage(items=items, next_cursor=next_cursor, previous_cursor=previous_cursor)
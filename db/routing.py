@@ -0,0 +1,32 @@
+import time
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from config import READ_YOUR_WRITES_SECONDS
+
+PRIMARY_UNTIL_COOKIE = "primary_until"
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def prefers_primary(request: Request) -> bool:
+    primary_until = request.cookies.get(PRIMARY_UNTIL_COOKIE)
+    try:
+        return primary_until is not None and float(primary_until) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_your_writes(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """Pin a caller's reads to the primary for a short window after it writes.
+
+    Replicas lag behind the primary, so a client reading right after its own
+    write could otherwise miss it.
+    """
+    response = await call_next(request)
+    if request.method not in READ_ONLY_METHODS and response.status_code < 400:
+        response.set_cookie(
+            PRIMARY_UNTIL_COOKIE, str(time.time() + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax",
+        )
+    return response
@@ -1,21 +1,38 @@
 from typing import Generator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from config import REAL_DATABASE_URL
+from config import REAL_DATABASE_URL, REPLICA_DATABASE_URL
+from db.engine import engine_options, instrument_pool
+from db.routing import prefers_primary
 
 engine = create_async_engine(
     REAL_DATABASE_URL,
     future=True,
-    echo=True,
-    execution_options={"isolation_level": "AUTOCOMMIT"},
+    **engine_options(),
 )
+instrument_pool(engine, name="primary")
 
 async_session = sessionmaker(engine,
                              expire_on_commit=False,
                              class_=AsyncSession)
 
+if REPLICA_DATABASE_URL:
+    read_engine = create_async_engine(
+        REPLICA_DATABASE_URL,
+        future=True,
+        **engine_options(),
+    )
+    instrument_pool(read_engine, name="replica")
+    async_read_session = sessionmaker(read_engine,
+                                      expire_on_commit=False,
+                                      class_=AsyncSession)
+else:
+    read_engine = engine
+    async_read_session = async_session
+
 Base = declarative_base()
 
 
@@ -25,3 +42,13 @@ async def get_db() -> Generator:
         yield session
     finally:
         await session.close()
+
+
+async def get_read_db(request: Request) -> Generator:
+    """Session for read-only queries, on a replica unless the caller wrote recently."""
+    session_factory = async_session if prefers_primary(request) else async_read_session
+    try:
+        session: AsyncSession = session_factory()
+        yield session
+    finally:
+        await session.close()
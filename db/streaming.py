@@ -0,0 +1,22 @@
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def stream_snapshot(db_session: AsyncSession, query: Select, batch_size: int) -> AsyncIterator[Sequence[Any]]:
+    """Yield the rows of `query` in partitions of `batch_size` through a server-side cursor.
+
+    The cursor runs in its own REPEATABLE READ READ ONLY transaction, so a long
+    export sees one consistent snapshot while at most one partition is held
+    in memory.
+    """
+    await db_session.connection(
+        execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True},
+    )
+    try:
+        result = await db_session.stream(query, execution_options={"yield_per": batch_size})
+        async for rows in result.partitions():
+            yield rows
+    finally:
+        await db_session.rollback()
@@ -3,6 +3,8 @@
 
 if [[ "${1}" == "celery" ]]; then
   celery --app=tasks.tasks:celery worker -l INFO
+elif [[ "${1}" == "outbox" ]]; then
+  python -m tasks.outbox
 elif [[ "${1}" == "flower" ]]; then
   celery --app=tasks.tasks:celery flower
  fi
\ No newline at end of file
@@ -2,4 +2,4 @@
 
 alembic upgrade head
 
-gunicorn main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8000
\ No newline at end of file
+gunicorn main:app --workers ${WEB_CONCURRENCY:-4} --worker-class uvicorn.workers.UvicornWorker --bind=0.0.0.0:8000
\ No newline at end of file
@@ -3,17 +3,26 @@ from fastapi import FastAPI
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi_pagination import add_pagination
+from prometheus_client import make_asgi_app
 from redis import asyncio as aioredis
 
+from apps.post.cache import post_cache, post_slug_cache
 from apps.post.routers import post_router
+from apps.responses import ResponseCoder
+from apps.user.cache import principal_cache
+from apps.user.hashing import password_hasher
 from apps.user.routers import user_router
-from config import APP_PORT, REDIS_HOST, REDIS_PORT
+from caching.namespaces import namespace_key_builder
+from config import APP_PORT, CACHE_EXPIRE_SECONDS, REDIS_HOST, REDIS_PORT
+from db.routing import read_your_writes
 
 app = FastAPI(title='blog_app')
 
 app.include_router(user_router)
 app.include_router(post_router)
 add_pagination(app)
+app.middleware("http")(read_your_writes)
+app.mount("/metrics", make_asgi_app())
 
 
 @app.on_event("startup")
@@ -21,7 +30,22 @@ async def startup_event():
     redis = aioredis.from_url(f"redis://{REDIS_HOST}:{REDIS_PORT}",
                               encoding="utf8",
                               decode_responses=True)
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(RedisBackend(redis),
+                      prefix="fastapi-cache",
+                      expire=CACHE_EXPIRE_SECONDS,
+                      key_builder=namespace_key_builder,
+                      coder=ResponseCoder)
+    await post_cache.start(redis)
+    await post_slug_cache.start(redis)
+    await principal_cache.start(redis)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await post_cache.stop()
+    await post_slug_cache.stop()
+    await principal_cache.stop()
+    password_hasher.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from db.session import Base
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+
+    id: int = Column(BigInteger, primary_key=True)
+    task: str = Column(String, nullable=False)
+    args: list = Column(JSONB, nullable=False, server_default="[]")
+    created_at: datetime = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
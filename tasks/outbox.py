@@ -0,0 +1,85 @@
+"""Transactional outbox: tasks are written next to the rows that cause them and relayed to Celery.
+
+Run the relay with `python -m tasks.outbox`.
+"""
+import asyncio
+import logging
+from typing import Sequence
+
+from sqlalchemy import (ColumnElement, Insert, Row, String, delete, func,
+                        insert, literal, select)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL_SECONDS
+from db.session import async_session
+from tasks.models import OutboxMessage
+from tasks.tasks import celery
+
+VERIFICATION_EMAIL_TASK = "tasks.tasks.send_email_for_verification"
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_from(task: str, *args: ColumnElement) -> Insert:
+    """INSERT ... SELECT of one `task` message per row the `args` columns come from.
+
+    Used as a CTE of the statement writing those rows, so the message commits
+    or rolls back with them and the request does no broker I/O.
+    """
+    return insert(OutboxMessage.__table__).from_select(
+        ["task", "args"], select(literal(task, String), func.jsonb_build_array(*args)),
+    )
+
+
+def _publish(messages: Sequence[Row]) -> None:
+    with celery.producer_or_acquire() as producer:
+        for message in messages:
+            celery.send_task(message.task, args=message.args, producer=producer)
+
+
+async def relay_batch(db_session: AsyncSession, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Publish the oldest `batch_size` messages and delete them, returns how many were relayed.
+
+    Messages are claimed FOR UPDATE SKIP LOCKED, so several relays split the
+    backlog, and deleted by the same transaction once the broker accepted all
+    of them. If publishing fails the claim rolls back and the batch is retried,
+    delivery is at least once.
+    """
+    await db_session.connection(execution_options={"isolation_level": "READ COMMITTED"})
+    try:
+        result = await db_session.execute(
+            select(OutboxMessage.id, OutboxMessage.task, OutboxMessage.args)
+            .order_by(OutboxMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = result.all()
+        if messages:
+            # Kombu publishes synchronously, keep the event loop free while it does.
+            await asyncio.to_thread(_publish, messages)
+            await db_session.execute(
+                delete(OutboxMessage).where(OutboxMessage.id.in_([message.id for message in messages]))
+            )
+        await db_session.commit()
+    except BaseException:
+        await db_session.rollback()
+        raise
+    return len(messages)
+
+
+async def run_relay(batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = OUTBOX_POLL_INTERVAL_SECONDS) -> None:
+    while True:
+        try:
+            async with async_session() as db_session:
+                relayed = await relay_batch(db_session, batch_size)
+        except Exception:
+            logger.warning(f"Outbox relay failed, retrying in {poll_interval}s:", exc_info=True)
+            relayed = 0
+        # A full batch means there is likely more waiting, drain it before sleeping.
+        if relayed < batch_size:
+            await asyncio.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_relay())
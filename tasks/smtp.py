@@ -0,0 +1,112 @@
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from queue import Empty, LifoQueue
+
+
+class _PooledConnection:
+    __slots__ = ("smtp", "sent", "last_used")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+def _close(connection: _PooledConnection) -> None:
+    try:
+        connection.smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.smtp.close()
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of logged in SMTP connections, one per worker process.
+
+    At most `size` messages are sent at once, each over a reused connection.
+    A connection idle for longer than `health_check_seconds` is probed with
+    NOOP before use, and one that has sent `max_messages` is closed, so the
+    server never sees a session outlive its limits.
+    """
+
+    def __init__(
+            self, host: str, port: int, user: str | None, password: str | None, size: int, max_messages: int,
+            health_check_seconds: float, timeout: float, use_ssl: bool = True,
+    ):
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._max_messages = max_messages
+        self._health_check_seconds = health_check_seconds
+        self._timeout = timeout
+        self._use_ssl = use_ssl
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: LifoQueue[_PooledConnection] = LifoQueue()
+
+    def send_message(self, message: EmailMessage) -> None:
+        with self._slots:
+            connection = self._acquire()
+            try:
+                connection.smtp.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped the session between health checks, one retry on a fresh connection.
+                _close(connection)
+                connection = self._connect()
+                self._send_or_close(connection, message)
+            except BaseException:
+                _close(connection)
+                raise
+            self._release(connection)
+
+    def close(self) -> None:
+        while True:
+            try:
+                _close(self._idle.get_nowait())
+            except Empty:
+                return
+
+    def _connect(self) -> _PooledConnection:
+        smtp_class = smtplib.SMTP_SSL if self._use_ssl else smtplib.SMTP
+        smtp = smtp_class(self._host, self._port, timeout=self._timeout)
+        try:
+            if self._user and self._password:
+                smtp.login(self._user, self._password)
+        except BaseException:
+            smtp.close()
+            raise
+        return _PooledConnection(smtp)
+
+    def _acquire(self) -> _PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except Empty:
+                return self._connect()
+            if time.monotonic() - connection.last_used < self._health_check_seconds or self._is_alive(connection):
+                return connection
+            _close(connection)
+
+    def _release(self, connection: _PooledConnection) -> None:
+        connection.sent += 1
+        connection.last_used = time.monotonic()
+        if connection.sent >= self._max_messages:
+            _close(connection)
+        else:
+            self._idle.put(connection)
+
+    @staticmethod
+    def _is_alive(connection: _PooledConnection) -> bool:
+        try:
+            return connection.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _send_or_close(connection: _PooledConnection, message: EmailMessage) -> None:
+        try:
+            connection.smtp.send_message(message)
+        except BaseException:
+            _close(connection)
+            raise
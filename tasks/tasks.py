@@ -1,14 +1,45 @@
-import smtplib
 from datetime import timedelta
 from email.message import EmailMessage
 
 from celery import Celery
+from celery.signals import (worker_process_init, worker_process_shutdown,
+                            worker_shutdown)
 
 from apps.user import security
-from config import (ACCESS_TOKEN_EXPIRE_MINUTES, APP_PORT, REDIS_HOST,
-                    REDIS_PORT, SMTP_HOST, SMTP_PASSWORD, SMTP_PORT, SMTP_USER)
+from config import (ACCESS_TOKEN_EXPIRE_MINUTES, APP_PORT,
+                    CELERY_WORKER_CONCURRENCY, CELERY_WORKER_POOL, REDIS_HOST,
+                    REDIS_PORT, SMTP_HEALTH_CHECK_SECONDS, SMTP_HOST,
+                    SMTP_MAX_MESSAGES_PER_CONNECTION, SMTP_PASSWORD,
+                    SMTP_POOL_SIZE, SMTP_PORT, SMTP_TIMEOUT_SECONDS,
+                    SMTP_USE_SSL, SMTP_USER)
+from tasks.smtp import SMTPConnectionPool
 
 celery = Celery('tasks', broker=f'redis://{REDIS_HOST}:{REDIS_PORT}')
+celery.conf.update(worker_pool=CELERY_WORKER_POOL, worker_concurrency=CELERY_WORKER_CONCURRENCY)
+
+smtp_pool = SMTPConnectionPool(
+    host=SMTP_HOST,
+    port=SMTP_PORT,
+    user=SMTP_USER,
+    password=SMTP_PASSWORD,
+    size=SMTP_POOL_SIZE,
+    max_messages=SMTP_MAX_MESSAGES_PER_CONNECTION,
+    health_check_seconds=SMTP_HEALTH_CHECK_SECONDS,
+    timeout=SMTP_TIMEOUT_SECONDS,
+    use_ssl=SMTP_USE_SSL,
+)
+
+
+@worker_process_init.connect
+def reset_smtp_pool(**kwargs):
+    # A forked child must not share sockets opened by its parent.
+    smtp_pool.close()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_smtp_pool(**kwargs):
+    smtp_pool.close()
 
 
 def setup_email_for_verification(username: str, user_email: str):
@@ -41,6 +72,4 @@ def setup_email_for_verification(username: str, user_email: str):
 @celery.task
 def send_email_for_verification(username: str, user_email):
     email = setup_email_for_verification(username, user_email)
-    with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT) as server:
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        server.send_message(email)
+    smtp_pool.send_message(email)
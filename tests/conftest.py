@@ -7,14 +7,17 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.sql import text
+from starlette.requests import Request
 from starlette.testclient import TestClient
 
 from apps.user.security import create_access_token
 from config import ACCESS_TOKEN_EXPIRE_MINUTES, TEST_DATABASE_URL
-from db.session import Base, get_db
+from db.routing import prefers_primary
+from db.session import Base, get_db, get_read_db
 from main import app
 
 CLEAN_TABLES = [
+    "outbox",
     "posts",
     "users"
 ]
@@ -48,6 +51,7 @@ async def async_session_test(async_test_engine):
 @pytest.fixture(scope='session', autouse=True)
 async def prepare_database(async_test_engine):
     async with async_test_engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
         await conn.run_sync(Base.metadata.create_all)
     yield
     async with async_test_engine.begin() as conn:
@@ -86,10 +90,55 @@ async def get_test_db() -> Generator:
 @pytest.fixture(scope="function")
 async def client() -> Generator[TestClient, Any, None]:
     app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
     with TestClient(app) as client:
         yield client
 
 
+@pytest.fixture(scope="function")
+async def lagging_replica(client, asyncpg_pool):
+    """Serve `get_read_db` from a snapshot of the database as it is now.
+
+    Stands in for a replica that has not replayed the writes the test makes
+    afterwards: the snapshot is exported from a transaction held open for the
+    whole test and imported by every read session. Like `get_read_db`, callers
+    inside their `primary_until` window read the database itself.
+    """
+    async with asyncpg_pool.acquire() as connection:
+        async with connection.transaction(isolation="repeatable_read",
+                                          readonly=True):
+            snapshot = await connection.fetchval(
+                "SELECT pg_export_snapshot();")
+
+            async def get_lagging_db(request: Request) -> Generator:
+                if prefers_primary(request):
+                    async for session in get_test_db():
+                        yield session
+                    return
+                async_test_engine = create_async_engine(TEST_DATABASE_URL,
+                                                        future=True,
+                                                        echo=False)
+                async_test_session = sessionmaker(bind=async_test_engine,
+                                                  expire_on_commit=False,
+                                                  class_=AsyncSession)
+                session: AsyncSession = async_test_session()
+                try:
+                    await session.connection(execution_options={
+                        "isolation_level": "REPEATABLE READ"})
+                    await session.execute(
+                        text(f"SET TRANSACTION SNAPSHOT '{snapshot}';"))
+                    yield session
+                finally:
+                    await session.close()
+                    await async_test_engine.dispose()
+
+            app.dependency_overrides[get_read_db] = get_lagging_db
+            try:
+                yield
+            finally:
+                app.dependency_overrides[get_read_db] = get_test_db
+
+
 @pytest.fixture(scope="session")
 async def asyncpg_pool():
     pool = await asyncpg.create_pool(
@@ -110,6 +159,17 @@ async def get_user_from_database(asyncpg_pool):
     return get_user_from_database_by_id
 
 
+@pytest.fixture
+async def get_outbox_messages(asyncpg_pool):
+    async def get_outbox_messages_by_task(task: str):
+        async with asyncpg_pool.acquire() as connection:
+            return await connection.fetch(
+                "SELECT * FROM outbox WHERE task = $1 ORDER BY id;", task
+            )
+
+    return get_outbox_messages_by_task
+
+
 @pytest.fixture
 async def get_post_from_database(asyncpg_pool):
     async def get_post_from_database_by_id(post_id: str):
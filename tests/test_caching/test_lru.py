@@ -0,0 +1,48 @@
+from caching.lru import LRUCache
+
+
+def test_lru_evicts_least_recently_used_over_max_bytes():
+    cache = LRUCache(max_entries=100, max_bytes=10, ttl=60)
+    cache.set("a", "A", size=4)
+    cache.set("b", "B", size=4)
+    assert cache.get("a") == "A"
+    cache.set("c", "C", size=4)
+    assert cache.size_bytes == 8
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_lru_evicts_over_max_entries():
+    cache = LRUCache(max_entries=2, max_bytes=100, ttl=60)
+    for key in ["a", "b", "c"]:
+        cache.set(key, key.upper(), size=1)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_lru_skips_entry_larger_than_max_bytes():
+    cache = LRUCache(max_entries=100, max_bytes=10, ttl=60)
+    cache.set("a", "A", size=4)
+    cache.set("b", "B", size=11)
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.size_bytes == 4
+
+
+def test_lru_replacing_entry_updates_size():
+    cache = LRUCache(max_entries=100, max_bytes=10, ttl=60)
+    cache.set("a", "A", size=4)
+    cache.set("a", "AA", size=6)
+    assert cache.size_bytes == 6
+    cache.pop("a")
+    assert cache.size_bytes == 0
+    assert len(cache) == 0
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(max_entries=100, max_bytes=10, ttl=-1)
+    cache.set("a", "A", size=4)
+    assert cache.get("a") is None
+    assert cache.size_bytes == 0
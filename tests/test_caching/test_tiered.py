@@ -0,0 +1,112 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+
+from caching.tiered import TieredCache
+from config import REDIS_HOST, REDIS_PORT
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+@pytest.fixture
+async def redis():
+    redis = aioredis.from_url(f"redis://{REDIS_HOST}:{REDIS_PORT}",
+                              encoding="utf8",
+                              decode_responses=True)
+    yield redis
+    await redis.close()
+
+
+@pytest.fixture
+async def make_cache(redis):
+    name = f"test-{uuid4().hex}"
+    caches = []
+
+    async def make_cache(max_bytes: int = 1024 * 1024) -> TieredCache[Item]:
+        cache = TieredCache(name=name, model=Item, ttl=60, local_ttl=60,
+                            max_entries=100, max_bytes=max_bytes)
+        await cache.start(redis)
+        caches.append(cache)
+        for _ in range(100):
+            if cache._subscribed:
+                break
+            await asyncio.sleep(0.01)
+        assert cache._subscribed
+        return cache
+
+    yield make_cache
+    for cache in caches:
+        await cache.stop()
+    keys = [key async for key in redis.scan_iter(f"*{name}*")]
+    if keys:
+        await redis.delete(*keys)
+
+
+def loader_of(item: Item | None, calls: list):
+    async def load() -> Item | None:
+        calls.append(item)
+        return item
+
+    return load
+
+
+async def test_tiered_cache_reads_through_tiers(make_cache, redis):
+    cache = await make_cache()
+    calls = []
+    item = Item(id=1, name="first")
+    assert await cache.get_or_load("1", loader_of(item, calls)) == item
+    assert await cache.get_or_load("1", loader_of(None, calls)) == item
+    assert calls == [item]
+    assert await redis.get(cache._redis_key("1")) == item.model_dump_json()
+    other_worker = await make_cache()
+    assert await other_worker.get_or_load("1", loader_of(None, calls)) == item
+    assert calls == [item]
+
+
+async def test_tiered_cache_invalidation_reaches_other_workers(make_cache):
+    cache, other_worker = await make_cache(), await make_cache()
+    calls = []
+    old, new = Item(id=1, name="old"), Item(id=1, name="new")
+    await cache.get_or_load("1", loader_of(old, calls))
+    assert await other_worker.get_or_load("1", loader_of(old, calls)) == old
+    await cache.invalidate("1")
+    for _ in range(100):
+        if not len(other_worker._local):
+            break
+        await asyncio.sleep(0.01)
+    assert await other_worker.get_or_load("1", loader_of(new, calls)) == new
+    assert await cache.get_or_load("1", loader_of(None, calls)) == new
+
+
+async def test_tiered_cache_load_racing_invalidation_is_not_cached(make_cache, redis):
+    cache = await make_cache()
+    old, new = Item(id=1, name="old"), Item(id=1, name="new")
+
+    async def load_then_get_invalidated() -> Item:
+        # The row is changed and invalidated after the loader read it.
+        await cache.invalidate("1")
+        return old
+
+    assert await cache.get_or_load("1", load_then_get_invalidated) == old
+    assert await redis.get(cache._redis_key("1")) is None
+    assert not len(cache._local)
+    calls = []
+    assert await cache.get_or_load("1", loader_of(new, calls)) == new
+    assert calls == [new]
+    assert await cache.get_or_load("1", loader_of(None, calls)) == new
+
+
+async def test_tiered_cache_local_tier_bounded_by_bytes(make_cache):
+    item_size = len(Item(id=1, name="item").model_dump_json())
+    cache = await make_cache(max_bytes=item_size * 2)
+    for item_id in range(3):
+        await cache.get_or_load(str(item_id), loader_of(Item(id=item_id, name="item"), []))
+    assert len(cache._local) == 2
+    assert cache._local.size_bytes <= item_size * 2
+    assert cache._local.get("0") is None
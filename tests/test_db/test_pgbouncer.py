@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from apps.post.repository.sqlalchemy import SQLAlchemyPostRepository
+from apps.post.schemas import PostCreate, PostImportRow
+from apps.user.repository.sqlalchemy import SQLAlchemyUserRepository
+from apps.user.schemas import UserCreate, UserListFilter
+from config import PGBOUNCER_TEST_DATABASE_URL
+from db.engine import engine_options
+from tasks import outbox
+from tasks.models import OutboxMessage
+
+pytestmark = pytest.mark.skipif(PGBOUNCER_TEST_DATABASE_URL is None,
+                                reason="PGBOUNCER_HOST_TEST is not set")
+
+
+@pytest.fixture
+async def pgbouncer_session():
+    engine = create_async_engine(PGBOUNCER_TEST_DATABASE_URL,
+                                 **engine_options(pgbouncer=True,
+                                                  pool_size=4,
+                                                  max_overflow=0,
+                                                  echo=False))
+    yield sessionmaker(bind=engine, expire_on_commit=False,
+                       class_=AsyncSession)
+    await engine.dispose()
+
+
+async def exercise_repositories(session_maker, number: int):
+    async with session_maker() as session:
+        user_repository = SQLAlchemyUserRepository(db_session=session)
+        post_repository = SQLAlchemyPostRepository(db_session=session)
+
+        user = await user_repository.create(UserCreate(
+            username=f"bouncer{number}",
+            email=f"bouncer{number}@kek.com",
+            password="SamplePass",
+        ))
+        assert (await user_repository.get_user(user.id)).id == user.id
+        assert (await user_repository.get_by_username(
+            user.username, consistent=True)).id == user.id
+        # Nothing holds the server connection while a password is checked.
+        assert not session.in_transaction()
+        page = await user_repository.get_page(
+            filters=UserListFilter(username_prefix="bouncer"), size=50)
+        assert user.id in [row.id for row in page.items]
+        outcome = await user_repository.update_if_permitted(
+            user_id=user.id, current_user=user,
+            updated_user_params={"email": f"moved{number}@kek.com"})
+        assert outcome.updated_user.email == f"moved{number}@kek.com"
+        # Guarded updates are one statement of CTEs over a single snapshot.
+        outcome = await user_repository.verify_email(user.username)
+        assert outcome.updated_user.is_verified_email
+        outcome = await user_repository.set_admin(user.id, is_admin=True)
+        assert outcome.updated_user.is_admin
+        outcome = await user_repository.set_admin(user.id, is_admin=True)
+        assert outcome.found and outcome.updated_user is None
+        # The server-side cursor lives in one transaction, so it stays on
+        # one backend until the export is done.
+        exported = [rows async for rows in user_repository.export(
+            batch_size=2)]
+        assert all(len(rows) <= 2 for rows in exported)
+        assert user.id in [row.id for rows in exported for row in rows]
+
+        post = await post_repository.create(PostCreate(
+            title=f"bouncer title {number}",
+            text="some_text",
+            short_description="some_description",
+        ), current_user=user)
+        assert (await post_repository.get_post(post.id)).id == post.id
+        imported = await post_repository.bulk_create([
+            PostImportRow(title=f"bouncer import {number}", text="some_text",
+                          short_description="some_description",
+                          author_id=user.id)
+            for _ in range(2)
+        ])
+        assert imported == 2
+        page = await post_repository.get_page_by_user_id(user.id, size=10)
+        assert sorted(row.slug for row in page.items) == [
+            f"bouncer-import-{number}", f"bouncer-import-{number}-2",
+            f"bouncer-title-{number}",
+        ]
+        assert await post_repository.exists(post.id)
+        updated_post = await post_repository.update_if_permitted(
+            post_id=post.id, current_user=user,
+            updated_post_params={"text": "other_text"})
+        assert updated_post.text == "other_text"
+        assert await post_repository.delete_if_permitted(
+            post_id=post.id, current_user=user)
+        outcome = await user_repository.delete_if_permitted(
+            user_id=user.id, current_user=user)
+        assert outcome.deleted
+
+
+async def test_repositories_through_transaction_pooler(pgbouncer_session):
+    # More concurrent sessions than server connections, so consecutive
+    # statements of one session land on different backends.
+    await asyncio.gather(*(
+        exercise_repositories(pgbouncer_session, number)
+        for number in range(12)
+    ))
+
+
+async def test_outbox_relay_through_transaction_pooler(pgbouncer_session,
+                                                       monkeypatch):
+    published = []
+    monkeypatch.setattr(outbox, "_publish", lambda messages: published.extend(
+        message.id for message in messages))
+    async with pgbouncer_session() as session:
+        user_repository = SQLAlchemyUserRepository(db_session=session)
+        for number in range(10):
+            await user_repository.create(UserCreate(
+                username=f"relayed{number}",
+                email=f"relayed{number}@kek.com",
+                password="SamplePass",
+            ))
+
+    async def relay():
+        async with pgbouncer_session() as session:
+            while await outbox.relay_batch(session, batch_size=3):
+                pass
+
+    # Concurrent relays claim disjoint batches with FOR UPDATE SKIP LOCKED.
+    await asyncio.gather(*(relay() for _ in range(4)))
+    assert len(published) == len(set(published)) == 10
+    async with pgbouncer_session() as session:
+        result = await session.execute(
+            select(func.count()).select_from(OutboxMessage))
+        assert result.scalar() == 0
@@ -1,3 +1,4 @@
+import datetime
 import json
 
 from slugify import slugify
@@ -44,3 +45,71 @@ async def test_create_post(client,
     assert user_from_db["author_id"] == user_data["id"]
     assert user_from_db["slug"] == slugify(post_data["title"])
     assert user_from_db["id"] == data_from_resp["id"]
+
+
+async def test_create_post_pins_reads_to_primary(client,
+                                                 create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "title": "sometitle",
+        "text": "some_text",
+        "short_description": "some_description",
+    }
+    await create_user_in_database(**user_data)
+    resp = client.get("/posts/list")
+    assert "primary_until" not in resp.cookies
+    resp = client.post("/posts/", content=json.dumps(post_data),
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    assert "primary_until" in resp.cookies
+
+
+async def test_create_post_with_taken_slug(client,
+                                           create_user_in_database,
+                                           create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "title": "Some Title",
+        "text": "some_text",
+        "short_description": "some_description",
+    }
+    await create_user_in_database(**user_data)
+    await create_post_in_database(
+        id=100,
+        author_id=user_data["id"],
+        slug="some-title-7",
+        title="Some Title",
+        text="some_text",
+        short_description="some_description",
+        published_at=datetime.date(2023, 5, 15),
+    )
+    slugs = []
+    for _ in range(2):
+        resp = client.post("/posts/", content=json.dumps(post_data),
+                           headers=create_test_auth_headers_for_user(
+                               user_data["username"]))
+        assert resp.status_code == 200
+        slugs.append(resp.json()["slug"])
+    assert slugs == ["some-title", "some-title-8"]
+    resp = client.get("/posts/by-slug/some-title-8")
+    assert resp.status_code == 200
+    assert resp.json()["slug"] == "some-title-8"
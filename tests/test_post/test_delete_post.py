@@ -1,4 +1,5 @@
 import datetime
+import json
 
 import pytest
 
@@ -164,3 +165,109 @@ async def test_delete_post_by_another_user_error(
         headers=create_test_auth_headers_for_user(user_who_delete["username"]),
     )
     assert resp.status_code == 403
+    assert resp.json() == {"detail": "Forbidden."}
+
+
+async def test_update_post_by_another_user_error(client,
+                                                 create_user_in_database,
+                                                 create_post_in_database,
+                                                 get_post_from_database):
+    author_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    other_user_data = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "id": 1,
+        "author_id": author_data["id"],
+        "slug": "someslug",
+        "title": "sometitle",
+        "text": "some_text",
+        "short_description": "some_description",
+        "published_at": datetime.date(2023, 5, 15),
+    }
+    for user_data in [author_data, other_user_data]:
+        await create_user_in_database(**user_data)
+    await create_post_in_database(**post_data)
+    resp = client.patch(
+        f"/posts/?post_id={post_data['id']}",
+        content=json.dumps({"text": "other_text"}),
+        headers=create_test_auth_headers_for_user(
+            other_user_data["username"]),
+    )
+    assert resp.status_code == 403
+    assert resp.json() == {"detail": "Forbidden."}
+    post_from_db = dict((await get_post_from_database(post_data["id"]))[0])
+    assert post_from_db["text"] == post_data["text"]
+
+
+@pytest.mark.parametrize(
+    "is_admin, is_superuser",
+    [
+        (True, False),
+        (False, True),
+    ]
+)
+async def test_admin_manages_regular_user_post(client,
+                                               create_user_in_database,
+                                               create_post_in_database,
+                                               get_post_from_database,
+                                               is_admin,
+                                               is_superuser):
+    author_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    admin_data = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": is_admin,
+        "is_superuser": is_superuser,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "id": 1,
+        "author_id": author_data["id"],
+        "slug": "someslug",
+        "title": "sometitle",
+        "text": "some_text",
+        "short_description": "some_description",
+        "published_at": datetime.date(2023, 5, 15),
+    }
+    for user_data in [author_data, admin_data]:
+        await create_user_in_database(**user_data)
+    await create_post_in_database(**post_data)
+    headers = create_test_auth_headers_for_user(admin_data["username"])
+    resp = client.patch(f"/posts/?post_id={post_data['id']}",
+                        content=json.dumps({"text": "other_text"}),
+                        headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["text"] == "other_text"
+    resp = client.delete(f"/posts/?post_id={post_data['id']}",
+                         headers=headers)
+    assert resp.status_code == 204
+    assert await get_post_from_database(post_data["id"]) == []
@@ -1,7 +1,11 @@
 import datetime
+import json
+import re
 
 import pytest
 
+from tests.conftest import create_test_auth_headers_for_user
+
 
 @pytest.mark.parametrize(
     "type_finding, data_for_finding",
@@ -159,7 +163,6 @@ async def test_get_all_posts_list(client,
                 "id": 1,
                 "author_id": 1,
                 "title": "sometitle",
-                "text": "some_text",
                 "short_description": "some_description",
                 "slug": "someslug",
                 "published_at": "2023-05-14T21:00:00Z"
@@ -168,17 +171,215 @@ async def test_get_all_posts_list(client,
                 "id": 2,
                 "author_id": 2,
                 "title": "sometitle2",
-                "text": "some_text2",
                 "short_description": "some_description2",
                 "slug": "someslug2",
                 "published_at": "2022-05-14T21:00:00Z"
             }
         ],
-        "total": 2,
-        "page": 1,
-        "size": 50,
-        "pages": 1
+        "previous_page": None,
+        "next_page": None
+    }
+
+
+async def test_get_all_posts_reads_own_writes_past_lagging_replica(
+        client, lagging_replica, create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "title": "sometitle",
+        "text": "some_text",
+        "short_description": "some_description",
     }
+    await create_user_in_database(**user_data)
+    headers = create_test_auth_headers_for_user(user_data["username"])
+    assert client.get("/posts/list").json()["items"] == []
+    resp = client.post("/posts/", content=json.dumps(post_data),
+                       headers=headers)
+    assert resp.status_code == 200
+    post_id = resp.json()["id"]
+    for path in ["/posts/list", f"/posts/user_id?user_id={user_data['id']}",
+                 "/posts/search?q=sometitle"]:
+        # Read twice: the second response comes from the cache filled by the first.
+        for _ in range(2):
+            resp = client.get(path)
+            assert resp.status_code == 200
+            assert [post["id"] for post in resp.json()["items"]] == [post_id]
+    # Past the read-your-writes window uncached reads go to the replica.
+    client.cookies.clear()
+    assert client.get(f"/posts/?post_id={post_id}").status_code == 404
+
+
+async def test_get_all_posts_list_fresh_after_writes(client,
+                                                     create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "title": "sometitle",
+        "text": "some_text",
+        "short_description": "some_description",
+    }
+    await create_user_in_database(**user_data)
+    headers = create_test_auth_headers_for_user(user_data["username"])
+
+    def titles_listed():
+        resp = client.get("/posts/list")
+        assert resp.status_code == 200
+        assert resp.headers["Cache-Control"] == "no-cache"
+        assert resp.headers["ETag"]
+        return [post["title"] for post in resp.json()["items"]]
+
+    assert titles_listed() == []
+    resp = client.post("/posts/", content=json.dumps(post_data),
+                       headers=headers)
+    post_id = resp.json()["id"]
+    assert titles_listed() == ["sometitle"]
+    resp = client.patch(f"/posts/?post_id={post_id}",
+                        content=json.dumps({"title": "newtitle"}),
+                        headers=headers)
+    assert resp.status_code == 200
+    assert titles_listed() == ["newtitle"]
+    resp = client.delete(f"/posts/?post_id={post_id}", headers=headers)
+    assert resp.status_code == 204
+    assert titles_listed() == []
+
+
+async def test_get_all_posts_list_revalidates_with_etag(
+        client, create_user_in_database, create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    await create_post_in_database(
+        id=1,
+        author_id=user_data["id"],
+        slug="someslug",
+        title="sometitle",
+        text="some_text",
+        short_description="some_description",
+        published_at=datetime.date(2023, 5, 15),
+    )
+    resp = client.get("/posts/list")
+    assert resp.headers["X-Cache"] == "MISS"
+    etag = resp.headers["ETag"]
+    assert re.fullmatch(r'W/"[0-9a-f]{40}"', etag)
+    resp = client.get("/posts/list")
+    assert resp.headers["X-Cache"] == "HIT"
+    assert resp.headers["ETag"] == etag
+    resp = client.get("/posts/list", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["Cache-Control"] == "no-cache"
+    assert resp.headers["ETag"] == etag
+
+
+async def test_get_posts_same_body_with_fast_json_responses(
+        client, create_user_in_database, create_post_in_database, monkeypatch):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    await create_post_in_database(
+        id=1,
+        author_id=user_data["id"],
+        slug="someslug",
+        title="sometitle",
+        text="some_text",
+        short_description="some_description",
+        published_at=datetime.date(2023, 5, 15),
+    )
+    urls = ["/posts/?post_id=1", "/posts/list"]
+    bodies = {}
+    for fast in [False, True]:
+        monkeypatch.setattr("apps.responses.FAST_JSON_RESPONSES", fast)
+        # An update that changes nothing drops the cached post and lists, so the first read misses.
+        resp = client.patch("/posts/?post_id=1",
+                            content=json.dumps({"text": "some_text"}),
+                            headers=create_test_auth_headers_for_user(
+                                user_data["username"]))
+        assert resp.status_code == 200
+        for read in ["miss", "hit"]:
+            for url in urls:
+                resp = client.get(url)
+                assert resp.status_code == 200
+                assert resp.headers["Content-Type"] == "application/json"
+                bodies[fast, read, url] = resp.content
+    for url in urls:
+        assert len({bodies[fast, read, url] for fast in [False, True]
+                    for read in ["miss", "hit"]}) == 1
+
+
+async def test_get_all_posts_list_keyset_pages(client,
+                                               create_user_in_database,
+                                               create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    for post_id in range(1, 4):
+        await create_post_in_database(
+            id=post_id,
+            author_id=user_data["id"],
+            slug=f"someslug{post_id}",
+            title=f"sometitle{post_id}",
+            text=f"some_text{post_id}",
+            short_description=f"some_description{post_id}",
+            published_at=datetime.date(2023, 5, post_id),
+        )
+    first_page = client.get("/posts/list?size=2").json()
+    assert [post["id"] for post in first_page["items"]] == [3, 2]
+    assert first_page["previous_page"] is None
+    assert first_page["next_page"] is not None
+    second_page = client.get(
+        f"/posts/list?size=2&cursor={first_page['next_page']}").json()
+    assert [post["id"] for post in second_page["items"]] == [1]
+    assert second_page["next_page"] is None
+    assert second_page["previous_page"] is not None
+    previous_page = client.get(
+        f"/posts/list?size=2&cursor={second_page['previous_page']}").json()
+    assert [post["id"] for post in previous_page["items"]] == [3, 2]
+    assert previous_page["previous_page"] is None
+
+
+async def test_get_all_posts_list_invalid_cursor(client):
+    resp = client.get("/posts/list?cursor=notacursor")
+    assert resp.status_code == 400
+    assert resp.json() == {"detail": "Invalid cursor."}
 
 
 async def test_get_posts_by_user_id(client,
@@ -234,14 +435,165 @@ async def test_get_posts_by_user_id(client,
                 "id": 1,
                 "author_id": 1,
                 "title": "sometitle",
-                "text": "some_text",
                 "short_description": "some_description",
                 "slug": "someslug",
                 "published_at": "2023-05-14T21:00:00Z"
             }
         ],
-        "total": 1,
-        "page": 1,
-        "size": 50,
-        "pages": 1
+        "previous_page": None,
+        "next_page": None
+    }
+
+
+async def test_get_posts_by_user_id_keyset_pages(client,
+                                                 create_user_in_database,
+                                                 create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    for post_id in range(1, 4):
+        await create_post_in_database(
+            id=post_id,
+            author_id=user_data["id"],
+            slug=f"someslug{post_id}",
+            title=f"sometitle{post_id}",
+            text=f"some_text{post_id}",
+            short_description=f"some_description{post_id}",
+            published_at=datetime.date(2023, 5, 1),
+        )
+    first_page = client.get(
+        f"/posts/user_id?user_id={user_data['id']}&size=2").json()
+    assert [post["id"] for post in first_page["items"]] == [3, 2]
+    second_page = client.get(
+        f"/posts/user_id?user_id={user_data['id']}&size=2"
+        f"&cursor={first_page['next_page']}").json()
+    assert [post["id"] for post in second_page["items"]] == [1]
+    assert second_page["next_page"] is None
+
+
+async def test_search_posts(client,
+                            create_user_in_database,
+                            create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    posts_data = [
+        (1, "Cooking pasta", "quick dinner", "boil water and add pasta"),
+        (2, "Gardening", "pasta-shaped flowers", "some flowers"),
+        (3, "Databases", "indexes", "btree and gin indexes"),
+        (4, "Pasta again", "pasta recipes", "pasta with pasta sauce"),
+    ]
+    await create_user_in_database(**user_data)
+    for post_id, title, short_description, text in posts_data:
+        await create_post_in_database(
+            id=post_id,
+            author_id=user_data["id"],
+            slug=f"someslug{post_id}",
+            title=title,
+            text=text,
+            short_description=short_description,
+            published_at=datetime.date(2023, 5, post_id),
+        )
+    first_page = client.get("/posts/search?q=pasta&size=2")
+    assert first_page.status_code == 200
+    first_page = first_page.json()
+    assert [post["id"] for post in first_page["items"]] == [4, 1]
+    assert first_page["next_page"] is not None
+    second_page = client.get(
+        f"/posts/search?q=pasta&size=2"
+        f"&cursor={first_page['next_page']}").json()
+    assert [post["id"] for post in second_page["items"]] == [2]
+    assert second_page["next_page"] is None
+    resp = client.get("/posts/search?q=kubernetes")
+    assert resp.json()["items"] == []
+
+
+async def test_search_posts_empty_query(client):
+    resp = client.get("/posts/search?q=")
+    assert resp.status_code == 422
+
+
+async def test_get_post_by_slug(client,
+                                create_user_in_database,
+                                create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    post_data = {
+        "id": 1,
+        "author_id": user_data["id"],
+        "slug": "someslug",
+        "title": "sometitle",
+        "text": "some_text",
+        "short_description": "some_description",
+        "published_at": datetime.date(2023, 5, 15),
     }
+    await create_user_in_database(**user_data)
+    await create_post_in_database(**post_data)
+    resp = client.get(f"/posts/by-slug/{post_data['slug']}")
+    assert resp.status_code == 200
+    assert resp.json()["id"] == post_data["id"]
+    resp = client.get("/posts/by-slug/fakeslug")
+    assert resp.status_code == 404
+    assert resp.json() == {"detail": "Post not found."}
+
+
+async def test_export_posts(client,
+                            create_user_in_database,
+                            create_post_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    for post_id in range(1, 4):
+        await create_post_in_database(
+            id=post_id,
+            author_id=user_data["id"],
+            slug=f"someslug{post_id}",
+            title=f"sometitle{post_id}",
+            text=f"some_text{post_id}",
+            short_description=f"some_description{post_id}",
+            published_at=datetime.date(2023, 5, post_id),
+        )
+    headers = create_test_auth_headers_for_user(user_data["username"])
+    resp = client.get("/posts/export", headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert rows[0]["slug"] == "someslug1"
+    resp = client.get("/posts/export?format=csv", headers=headers)
+    assert resp.status_code == 200
+    lines = resp.text.splitlines()
+    assert lines[0] == \
+           "id,author_id,slug,title,text,short_description,published_at"
+    assert len(lines) == 4
@@ -0,0 +1,231 @@
+import json
+
+from apps.post.repository.sqlalchemy import SQLAlchemyPostRepository
+from tests.conftest import create_test_auth_headers_for_user
+
+
+async def test_import_posts_ndjson(client,
+                                   create_user_in_database,
+                                   get_post_from_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    rows = [
+        {"title": "sometitle", "text": "some_text",
+         "short_description": "some_description"},
+        {"title": "sometitle", "text": "some_text2",
+         "short_description": "some_description2",
+         "published_at": "2023-05-15T10:00:00"},
+        {"title": "", "text": "some_text3",
+         "short_description": "some_description3"},
+        {"title": "othertitle", "text": "some_text4",
+         "short_description": "some_description4", "author_id": 42},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import?format=ndjson", content=body,
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 3
+    errors = {error["row"]: error["errors"] for error in report["errors"]}
+    assert sorted(errors) == [3, 4, 5]
+    assert errors[4] == ["author_id: User with id 42 not found."]
+    posts = client.get("/posts/list").json()["items"]
+    assert sorted(post["slug"] for post in posts) == \
+           ["sometitle", "sometitle-2"]
+    assert all(post["author_id"] == user_data["id"] for post in posts)
+
+
+async def test_import_posts_csv(client, create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": True,
+        "is_verified_email": False,
+    }
+    body = (
+        "title,text,short_description\r\n"
+        "sometitle,\"some, multiline\ntext\",some_description\r\n"
+        "broken,row\r\n"
+    )
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import?format=csv", content=body,
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "imported": 1,
+        "failed": 1,
+        "errors": [{"row": 2, "errors": ["Expected 3 fields, got 2"]}],
+    }
+
+
+async def test_import_posts_csv_quote_inside_unquoted_field(
+        client, create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": True,
+        "is_verified_email": False,
+    }
+    # The stray quote is literal, it must not open a field swallowing the rest.
+    body = (
+        "title,text,short_description\r\n"
+        "a 5\" screen,some_text,some_description\r\n"
+        "othertitle,\"some, multiline\ntext\",some_description\r\n"
+        "\"open,some_text\r\n"
+    )
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import?format=csv", content=body,
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "imported": 2,
+        "failed": 1,
+        "errors": [{"row": 3,
+                    "errors": ["Invalid CSV: unexpected end of data"]}],
+    }
+    posts = client.get("/posts/list").json()["items"]
+    assert sorted(post["title"] for post in posts) == \
+           ["a 5\" screen", "othertitle"]
+
+
+async def test_import_posts_forbidden(client, create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import", content="",
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 403
+    assert resp.json() == {"detail": "Forbidden."}
+
+
+async def test_import_posts_reserves_assigned_slugs(client,
+                                                    create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    # "sometitle 2" slugifies to the suffixed slug of the second "sometitle".
+    rows = [
+        {"title": title, "text": "some_text",
+         "short_description": "some_description"}
+        for title in ["sometitle", "sometitle", "sometitle 2"]
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n"
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import?format=ndjson", content=body,
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    assert resp.json()["imported"] == 3
+    posts = client.get("/posts/list").json()["items"]
+    assert sorted(post["slug"] for post in posts) == \
+           ["sometitle", "sometitle-2", "sometitle-2-2"]
+
+
+async def test_import_posts_rejects_nul_characters(client,
+                                                   create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    rows = [
+        {"title": "sometitle", "text": "some\u0000text",
+         "short_description": "some_description"},
+        {"title": "othertitle", "text": "some_text",
+         "short_description": "some_description"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n"
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import?format=ndjson", content=body,
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "imported": 1,
+        "failed": 1,
+        "errors": [{"row": 1, "errors": [
+            "text: Value error, NUL characters are not allowed"]}],
+    }
+
+
+async def test_import_posts_reports_rejected_batch(client,
+                                                   create_user_in_database,
+                                                   monkeypatch):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+
+    async def all_authors_exist(self, author_ids):
+        # The author check passes, then COPY hits the foreign key, like an author deleted in between.
+        return set(author_ids)
+
+    monkeypatch.setattr(SQLAlchemyPostRepository, "existing_author_ids",
+                        all_authors_exist)
+    rows = [
+        {"title": "sometitle", "text": "some_text",
+         "short_description": "some_description"},
+        {"title": "othertitle", "text": "some_text",
+         "short_description": "some_description", "author_id": 42},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\n"
+    await create_user_in_database(**user_data)
+    resp = client.post("/posts/import?format=ndjson", content=body,
+                       headers=create_test_auth_headers_for_user(
+                           user_data["username"]))
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["imported"] == 0
+    assert report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [1, 2]
+    assert all(error["errors"][0].startswith(
+        "Batch rejected by the database:") for error in report["errors"])
+    assert client.get("/posts/list").json()["items"] == []
@@ -0,0 +1,134 @@
+import smtplib
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from tasks.smtp import SMTPConnectionPool
+
+HOST = "127.0.0.1"
+
+
+class SinkHandler:
+    def __init__(self):
+        self.connections = 0
+        self.noops = 0
+        self.received = []
+        self.alive = True
+        self.rejected_recipients = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname,
+                          responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_NOOP(self, server, session, envelope, arg):
+        self.noops += 1
+        return "250 OK" if self.alive else "421 Service not available"
+
+    async def handle_RCPT(self, server, session, envelope, address,
+                          rcpt_options):
+        if address in self.rejected_recipients:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def sink():
+    with socket.socket() as probe:
+        probe.bind((HOST, 0))
+        port = probe.getsockname()[1]
+    handler = SinkHandler()
+    controller = Controller(handler, hostname=HOST, port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+@pytest.fixture
+def make_pool(sink):
+    _, port = sink
+    pools = []
+
+    def make_pool(**overrides) -> SMTPConnectionPool:
+        options = {
+            "host": HOST, "port": port, "user": None, "password": None,
+            "size": 2, "max_messages": 100, "health_check_seconds": 30,
+            "timeout": 5, "use_ssl": False, **overrides,
+        }
+        pool = SMTPConnectionPool(**options)
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.close()
+
+
+def new_message(to: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "blog@example.com"
+    message["To"] = to
+    message["Subject"] = "Verification"
+    message.set_content("Verify your email")
+    return message
+
+
+def test_pool_reuses_connection(sink, make_pool):
+    handler, _ = sink
+    pool = make_pool()
+    for number in range(3):
+        pool.send_message(new_message(f"user{number}@example.com"))
+    assert handler.connections == 1
+    assert len(handler.received) == 3
+
+
+def test_pool_recycles_connection_after_max_messages(sink, make_pool):
+    handler, _ = sink
+    pool = make_pool(max_messages=2)
+    for number in range(5):
+        pool.send_message(new_message(f"user{number}@example.com"))
+    assert handler.connections == 3
+    assert len(handler.received) == 5
+
+
+def test_pool_probes_idle_connection_with_noop(sink, make_pool):
+    handler, _ = sink
+    pool = make_pool(health_check_seconds=0)
+    pool.send_message(new_message("user1@example.com"))
+    pool.send_message(new_message("user2@example.com"))
+    assert (handler.noops, handler.connections) == (1, 1)
+    handler.alive = False
+    pool.send_message(new_message("user3@example.com"))
+    assert (handler.noops, handler.connections) == (2, 2)
+    assert len(handler.received) == 3
+
+
+def test_pool_retries_once_on_server_disconnect(sink, make_pool):
+    handler, _ = sink
+    pool = make_pool()
+    pool.send_message(new_message("user1@example.com"))
+    # The session drops between health checks.
+    pool._idle.queue[-1].smtp.sock.shutdown(socket.SHUT_RDWR)
+    pool.send_message(new_message("user2@example.com"))
+    assert handler.connections == 2
+    assert handler.received == ["user1@example.com", "user2@example.com"]
+
+
+def test_pool_closes_connection_after_error(sink, make_pool):
+    handler, _ = sink
+    handler.rejected_recipients.add("unknown@example.com")
+    pool = make_pool()
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.send_message(new_message("unknown@example.com"))
+    assert pool._idle.empty()
+    pool.send_message(new_message("user1@example.com"))
+    assert handler.connections == 2
+    assert handler.received == ["user1@example.com"]
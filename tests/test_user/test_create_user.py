@@ -2,8 +2,11 @@ import json
 
 import pytest
 
+from tasks.outbox import VERIFICATION_EMAIL_TASK
 
-async def test_create_user(client, get_user_from_database):
+
+async def test_create_user(client, get_user_from_database,
+                           get_outbox_messages):
     user_data = {
         "username": "Serega",
         "email": "lol@kek.com",
@@ -28,6 +31,10 @@ async def test_create_user(client, get_user_from_database):
     assert user_from_db["is_superuser"] is False
     assert user_from_db["is_verified_email"] is False
     assert user_from_db["id"] == data_from_resp["id"]
+    messages = await get_outbox_messages(VERIFICATION_EMAIL_TASK)
+    assert len(messages) == 1
+    assert json.loads(messages[0]["args"]) == \
+           [user_data["username"], user_data["email"]]
 
 
 @pytest.mark.parametrize(
@@ -58,6 +65,7 @@ async def test_create_user(client, get_user_from_database):
 )
 async def test_create_user_duplicate_data_error(client,
                                                 get_user_from_database,
+                                                get_outbox_messages,
                                                 user_data,
                                                 user_data_same,
                                                 expected_status_code,
@@ -84,6 +92,8 @@ async def test_create_user_duplicate_data_error(client,
     resp = client.post("/users/", content=json.dumps(user_data_same))
     assert resp.status_code == expected_status_code
     assert resp.json() == expected_detail
+    messages = await get_outbox_messages(VERIFICATION_EMAIL_TASK)
+    assert len(messages) == 1
 
 
 @pytest.mark.parametrize(
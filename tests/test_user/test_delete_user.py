@@ -164,3 +164,96 @@ async def test_reject_delete_superadmin(
     assert resp.json() == {"detail": "Superadmin cannot be deleted via API."}
     user_from_database = await get_user_from_database(user_for_deletion["id"])
     assert dict(user_from_database[0])["is_superuser"] is True
+
+
+async def test_delete_another_user_forbidden_keeps_user_active(
+        client,
+        create_user_in_database,
+        get_user_from_database,
+):
+    user_for_deletion = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    user_who_delete = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_for_deletion)
+    await create_user_in_database(**user_who_delete)
+    resp = client.delete(
+        f"/users/?user_id={user_for_deletion['id']}",
+        headers=create_test_auth_headers_for_user(user_who_delete["username"]),
+    )
+    assert resp.status_code == 403
+    assert resp.json() == {"detail": "Forbidden."}
+    user_from_database = await get_user_from_database(user_for_deletion["id"])
+    assert dict(user_from_database[0])["is_active"] is True
+
+
+async def test_delete_user_by_admin(
+        client,
+        create_user_in_database,
+        get_user_from_database,
+):
+    user_for_deletion = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    user_who_delete = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_for_deletion)
+    await create_user_in_database(**user_who_delete)
+    resp = client.delete(
+        f"/users/?user_id={user_for_deletion['id']}",
+        headers=create_test_auth_headers_for_user(user_who_delete["username"]),
+    )
+    assert resp.status_code == 204
+    user_from_database = await get_user_from_database(user_for_deletion["id"])
+    assert dict(user_from_database[0])["is_active"] is False
+
+
+async def test_delete_unknown_user(client, create_user_in_database):
+    user_who_delete = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_who_delete)
+    resp = client.delete(
+        "/users/?user_id=1",
+        headers=create_test_auth_headers_for_user(user_who_delete["username"]),
+    )
+    assert resp.status_code == 404
+    assert resp.json() == {"detail": "User not found."}
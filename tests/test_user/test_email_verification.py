@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from apps.user.security import create_access_token
+from config import ACCESS_TOKEN_EXPIRE_MINUTES
+
+
+def create_verification_token(username: str) -> str:
+    return create_access_token(
+        data={"sub": username},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+async def test_email_verification(client, create_user_in_database,
+                                  get_user_from_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    token = create_verification_token(user_data["username"])
+    resp = client.get(f"/users/verification_email?token={token}")
+    assert resp.status_code == 200
+    users_from_db = await get_user_from_database(user_data["id"])
+    assert dict(users_from_db[0])["is_verified_email"] is True
+    resp = client.get(f"/users/verification_email?token={token}")
+    assert resp.status_code == 409
+    assert resp.json() == {"detail": "Email is already verified."}
+
+
+async def test_email_verification_unknown_user(client):
+    token = create_verification_token("Serega")
+    resp = client.get(f"/users/verification_email?token={token}")
+    assert resp.status_code == 404
+    assert resp.json() == {"detail": "User not found."}
+
+
+async def test_email_verification_invalid_token(client):
+    resp = client.get("/users/verification_email?token=broken")
+    assert resp.status_code == 401
+    assert resp.json() == {"detail": "Invalid token"}
@@ -1,5 +1,6 @@
 import shutup; shutup.please()
 import datetime
+import json
 
 import pytest
 
@@ -136,13 +137,81 @@ async def test_get_all_users_list(client, create_user_in_database):
                        "is_verified_email": False
                    }
                ],
-               "total": 2,
-               "page": 1,
-               "size": 50,
-               "pages": 1
+               "previous_page": None,
+               "next_page": None
            }
 
 
+async def test_get_all_users_list_reads_own_writes_past_lagging_replica(
+        client, lagging_replica):
+    user_data = {
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "password": "SamplePass1!",
+    }
+    assert client.get("/users/list").json()["items"] == []
+    assert client.get("/users/search?prefix=Ser").json() == []
+    resp = client.post("/users/", content=json.dumps(user_data))
+    assert resp.status_code == 200
+    for _ in range(2):
+        resp = client.get("/users/list")
+        assert [user["username"] for user in resp.json()["items"]] == \
+               [user_data["username"]]
+        resp = client.get("/users/search?prefix=Ser")
+        assert [user["username"] for user in resp.json()] == \
+               [user_data["username"]]
+
+
+@pytest.mark.parametrize(
+    "query, expected_ids",
+    [
+        (
+                "is_admin=true",
+                [2]
+        ),
+        (
+                "is_verified_email=true",
+                [3]
+        ),
+        (
+                "username_prefix=Ser",
+                [1, 3]
+        ),
+        (
+                "username_prefix=Ser&is_verified_email=false",
+                [1]
+        ),
+        (
+                "username_prefix=%25",
+                []
+        ),
+    ]
+)
+async def test_get_all_users_list_filters(client,
+                                          create_user_in_database,
+                                          query,
+                                          expected_ids):
+    users_data = [
+        (1, "Serega", "lol@kek.com", False, False),
+        (2, "Maksim", "kek@lol.com", True, False),
+        (3, "Sergey", "cheburek@kek.com", False, True),
+    ]
+    for user_id, username, email, is_admin, is_verified_email in users_data:
+        await create_user_in_database(
+            id=user_id,
+            username=username,
+            email=email,
+            is_active=True,
+            hashed_password="SampleHashedPass",
+            is_admin=is_admin,
+            is_superuser=False,
+            is_verified_email=is_verified_email,
+        )
+    resp = client.get(f"/users/list?{query}")
+    assert resp.status_code == 200
+    assert [user["id"] for user in resp.json()["items"]] == expected_ids
+
+
 async def test_get_users_me_posts(client,
                                   create_user_in_database,
                                   create_post_in_database):
@@ -207,3 +276,117 @@ async def test_get_users_me_posts(client,
         "size": 50,
         "pages": 1
     }
+
+
+@pytest.mark.parametrize(
+    "query, expected_usernames",
+    [
+        (
+                "prefix=Ser",
+                ["Serega", "Sergey"]
+        ),
+        (
+                "prefix=Ser&limit=1",
+                ["Serega"]
+        ),
+        (
+                "prefix=maksi",
+                ["Maksim"]
+        ),
+        (
+                "prefix=qwerty",
+                []
+        ),
+    ]
+)
+async def test_search_users(client,
+                            create_user_in_database,
+                            query,
+                            expected_usernames):
+    users_data = [
+        (1, "Serega", "lol@kek.com", True),
+        (2, "Maksim", "kek@lol.com", True),
+        (3, "Sergey", "cheburek@kek.com", True),
+        (4, "Seraphim", "chebupel@kek.com", False),
+    ]
+    for user_id, username, email, is_active in users_data:
+        await create_user_in_database(
+            id=user_id,
+            username=username,
+            email=email,
+            is_active=is_active,
+            hashed_password="SampleHashedPass",
+            is_admin=False,
+            is_superuser=False,
+            is_verified_email=False,
+        )
+    resp = client.get(f"/users/search?{query}")
+    assert resp.status_code == 200
+    assert [user["username"] for user in resp.json()] == expected_usernames
+
+
+async def test_search_users_same_body_with_fast_json_responses(
+        client, create_user_in_database, monkeypatch):
+    users_data = [
+        (1, "Serega", "lol@kek.com"),
+        (2, "Sergey", "cheburek@kek.com"),
+    ]
+    for user_id, username, email in users_data:
+        await create_user_in_database(
+            id=user_id,
+            username=username,
+            email=email,
+            is_active=True,
+            hashed_password="SampleHashedPass",
+            is_admin=False,
+            is_superuser=False,
+            is_verified_email=False,
+        )
+    bodies = {}
+    for fast, new_username in [(False, "Maksim"), (True, "Vasiliy")]:
+        monkeypatch.setattr("apps.responses.FAST_JSON_RESPONSES", fast)
+        # A user outside the prefix drops the cached search, so the first read misses.
+        resp = client.post("/users/", content=json.dumps({
+            "username": new_username,
+            "email": f"{new_username.lower()}@kek.com",
+            "password": "SamplePass1!",
+        }))
+        assert resp.status_code == 200
+        for read in ["miss", "hit"]:
+            resp = client.get("/users/search?prefix=Ser")
+            assert resp.status_code == 200
+            assert resp.headers["Content-Type"] == "application/json"
+            bodies[fast, read] = resp.content
+    assert len(set(bodies.values())) == 1
+    assert [user["username"] for user in json.loads(bodies[True, "hit"])] == \
+           ["Serega", "Sergey"]
+
+
+async def test_export_users(client, create_user_in_database):
+    users_data = [
+        (1, "Serega", "lol@kek.com", True),
+        (2, "Maksim", "kek@lol.com", False),
+    ]
+    for user_id, username, email, is_admin in users_data:
+        await create_user_in_database(
+            id=user_id,
+            username=username,
+            email=email,
+            is_active=True,
+            hashed_password="SampleHashedPass",
+            is_admin=is_admin,
+            is_superuser=False,
+            is_verified_email=False,
+        )
+    resp = client.get("/users/export?format=csv",
+                      headers=create_test_auth_headers_for_user("Serega"))
+    assert resp.status_code == 200
+    assert resp.text.splitlines() == [
+        "id,username,email,is_active,is_admin,is_superuser,"
+        "is_verified_email",
+        "1,Serega,lol@kek.com,True,True,False,False",
+        "2,Maksim,kek@lol.com,True,False,False,False",
+    ]
+    resp = client.get("/users/export",
+                      headers=create_test_auth_headers_for_user("Maksim"))
+    assert resp.status_code == 403
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+
+from apps.user.hashing import (PasswordHasher, PasswordHasherBusyError,
+                               password_hasher)
+
+
+@pytest.fixture
+async def hasher():
+    hasher = PasswordHasher(max_workers=1, max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_password_hasher_hashes_and_verifies_in_pool(hasher):
+    hashed_password = await hasher.hash("SamplePass1!")
+    assert hashed_password != "SamplePass1!"
+    assert await hasher.verify("SamplePass1!", hashed_password) is True
+    assert await hasher.verify("WrongPass1!", hashed_password) is False
+
+
+async def test_password_hasher_rejects_jobs_over_max_pending(hasher):
+    pending = [asyncio.create_task(hasher.hash("SamplePass1!"))
+               for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordHasherBusyError):
+        await hasher.hash("SamplePass1!")
+    hashed_passwords = await asyncio.gather(*pending)
+    assert all(await hasher.verify("SamplePass1!", hashed_password)
+               for hashed_password in hashed_passwords)
+
+
+async def test_login_when_password_hasher_busy(client, monkeypatch,
+                                               create_user_in_database):
+    user_data = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data)
+    monkeypatch.setattr(password_hasher, "_max_pending", 0)
+    resp = client.post("/users/token", data={
+        "username": user_data["username"], "password": "SamplePass1!"})
+    assert resp.status_code == 503
+    assert resp.json() == {
+        "detail": "Too many password checks in progress, try again later."}
+
+
+async def test_create_user_when_password_hasher_busy(client, monkeypatch):
+    user_data = {
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "password": "SamplePass1!",
+    }
+    monkeypatch.setattr(password_hasher, "_max_pending", 0)
+    resp = client.post("/users/", content=json.dumps(user_data))
+    assert resp.status_code == 503
+    assert client.get("/users/username?username=Serega").status_code == 404
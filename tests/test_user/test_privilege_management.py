@@ -1,5 +1,8 @@
+from types import SimpleNamespace
+
 import pytest
 
+from apps.user.service import UserService
 from tests.conftest import create_test_auth_headers_for_user
 
 
@@ -133,3 +136,149 @@ async def test_revoke_admin_privilege_from_user_by_wrong_type_of_user(
     not_revoked_user_from_db = dict(not_revoked_user_from_db[0])
     assert not_revoked_user_from_db["id"] == user_data_for_revoke["id"]
     assert not_revoked_user_from_db["is_admin"] is True
+
+
+@pytest.mark.parametrize(
+    "is_admin, is_superuser, method, url, expected_detail",
+    [
+        (True, False, "patch", "/users/give_admin_privileges",
+         "User with id 1 already promoted to admin / superadmin."),
+        (False, True, "patch", "/users/give_admin_privileges",
+         "User with id 1 already promoted to admin / superadmin."),
+        (False, False, "patch", "/users/remove_admin_privileges",
+         "User with id 1 has no admin privileges."),
+        (True, True, "patch", "/users/remove_admin_privileges",
+         "Superuser privileges cannot be changed"),
+    ],
+)
+async def test_toggle_admin_privilege_conflict(
+        client, create_user_in_database, get_user_from_database,
+        is_admin, is_superuser, method, url, expected_detail
+):
+    user_data_for_toggle = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": is_admin,
+        "is_superuser": is_superuser,
+        "is_verified_email": False,
+    }
+    user_data_who_toggle = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": True,
+        "is_verified_email": True,
+    }
+    for user_data in [user_data_for_toggle, user_data_who_toggle]:
+        await create_user_in_database(**user_data)
+    resp = client.request(
+        method, f"{url}?user_id={user_data_for_toggle['id']}",
+        headers=create_test_auth_headers_for_user(
+            user_data_who_toggle["username"]),
+    )
+    assert resp.status_code == 409
+    assert resp.json() == {"detail": expected_detail}
+    user_from_db = dict((await get_user_from_database(
+        user_data_for_toggle["id"]))[0])
+    assert user_from_db["is_admin"] is is_admin
+
+
+async def test_add_admin_privilege_to_unknown_user(client,
+                                                   create_user_in_database):
+    user_data_who_promoted = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": True,
+        "is_verified_email": True,
+    }
+    await create_user_in_database(**user_data_who_promoted)
+    resp = client.patch(
+        "/users/give_admin_privileges?user_id=1",
+        headers=create_test_auth_headers_for_user(
+            user_data_who_promoted["username"]),
+    )
+    assert resp.status_code == 404
+    assert resp.json() == {"detail": "User not found."}
+
+
+async def test_revoked_admin_loses_access_immediately(client,
+                                                      create_user_in_database):
+    user_data_for_revoke = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    user_data_who_revoke = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": True,
+        "is_verified_email": True,
+    }
+    for user_data in [user_data_for_revoke, user_data_who_revoke]:
+        await create_user_in_database(**user_data)
+    admin_headers = create_test_auth_headers_for_user(
+        user_data_for_revoke["username"])
+    assert client.get("/users/export", headers=admin_headers).status_code == 200
+    resp = client.patch(
+        f"/users/remove_admin_privileges?user_id={user_data_for_revoke['id']}",
+        headers=create_test_auth_headers_for_user(
+            user_data_who_revoke["username"]),
+    )
+    assert resp.status_code == 200
+    resp = client.get("/users/export", headers=admin_headers)
+    assert resp.status_code == 403
+    assert resp.json() == {"detail": "Forbidden."}
+
+
+async def test_principal_loaded_during_revoke_is_not_cached(
+        client, create_user_in_database, monkeypatch
+):
+    user_data_for_revoke = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": True,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    await create_user_in_database(**user_data_for_revoke)
+    load_principal = UserService._load_principal
+    superuser = SimpleNamespace(id=2, is_superuser=True)
+
+    async def load_principal_then_revoke(self, username):
+        # The admin flag is revoked, and the principal invalidated, right after the miss read it.
+        principal = await load_principal(self, username=username)
+        monkeypatch.setattr(UserService, "_load_principal", load_principal)
+        result = await self.remove_admin_privilege(
+            user_id=user_data_for_revoke["id"], current_user=superuser)
+        assert result.success
+        return principal
+
+    monkeypatch.setattr(UserService, "_load_principal",
+                        load_principal_then_revoke)
+    admin_headers = create_test_auth_headers_for_user(
+        user_data_for_revoke["username"])
+    assert client.get("/users/export", headers=admin_headers).status_code == 200
+    resp = client.get("/users/export", headers=admin_headers)
+    assert resp.status_code == 403
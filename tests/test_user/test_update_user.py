@@ -2,6 +2,7 @@ import json
 
 import pytest
 
+from apps.user.hashing import password_hasher
 from tests.conftest import create_test_auth_headers_for_user
 
 
@@ -120,3 +121,92 @@ async def test_update_user_duplicate_data_error(client,
     )
     assert resp.status_code == 409
     assert resp.json() == expected_detail
+
+
+async def test_update_another_user_password_forbidden(client,
+                                                      create_user_in_database,
+                                                      get_user_from_database,
+                                                      monkeypatch):
+    user_data1 = {
+        "id": 1,
+        "username": "Serega",
+        "email": "lol@kek.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+    user_data2 = {
+        "id": 2,
+        "username": "Maksim",
+        "email": "kek@lol.com",
+        "is_active": True,
+        "hashed_password": "SampleHashedPass",
+        "is_admin": False,
+        "is_superuser": False,
+        "is_verified_email": False,
+    }
+
+    async def hash_not_expected(password):
+        raise AssertionError("A forbidden update must not hash the password")
+
+    monkeypatch.setattr(password_hasher, "hash", hash_not_expected)
+    for user_data in [user_data1, user_data2]:
+        await create_user_in_database(**user_data)
+    resp = client.patch(
+        f"/users/?user_id={user_data2['id']}",
+        content=json.dumps({"password": "SamplePass1!"}),
+        headers=create_test_auth_headers_for_user(user_data1["username"]),
+    )
+    assert resp.status_code == 403
+    assert resp.json() == {"detail": "Forbidden."}
+    user_from_db = dict((await get_user_from_database(user_data2["id"]))[0])
+    assert user_from_db["hashed_password"] == user_data2["hashed_password"]
+
+
+@pytest.mark.parametrize(
+    "current_user_role, target_user_role, expected_status_code",
+    [
+        ("admin", "user", 200),
+        ("admin", "admin", 403),
+        ("admin", "superuser", 403),
+        ("superuser", "user", 200),
+        ("superuser", "admin", 200),
+        ("superuser", "superuser", 403),
+        ("user", "user", 403),
+    ]
+)
+async def test_update_user_permissions(client,
+                                       create_user_in_database,
+                                       get_user_from_database,
+                                       current_user_role,
+                                       target_user_role,
+                                       expected_status_code):
+    users_data = [
+        (1, "Serega", "lol@kek.com", current_user_role),
+        (2, "Maksim", "kek@lol.com", target_user_role),
+    ]
+    for user_id, username, email, role in users_data:
+        await create_user_in_database(
+            id=user_id,
+            username=username,
+            email=email,
+            is_active=True,
+            hashed_password="SampleHashedPass",
+            is_admin=role == "admin",
+            is_superuser=role == "superuser",
+            is_verified_email=False,
+        )
+    for user_data_updated in [{"email": "cheburek@kek.com"},
+                              {"password": "SamplePass1!"}]:
+        resp = client.patch(
+            "/users/?user_id=2",
+            content=json.dumps(user_data_updated),
+            headers=create_test_auth_headers_for_user("Serega"),
+        )
+        assert resp.status_code == expected_status_code
+    user_from_db = dict((await get_user_from_database(2))[0])
+    updated = expected_status_code == 200
+    assert (user_from_db["email"] == "cheburek@kek.com") is updated
+    assert (user_from_db["hashed_password"] != "SampleHashedPass") is updated